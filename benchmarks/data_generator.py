@@ -0,0 +1,138 @@
+# benchmarks/data_generator.py
+
+# Seeded Synthetic Sales Data Generator
+
+import argparse
+import random
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+# ProductID -> (base name, variant names, price range)
+PRODUCTS = {
+    "P101": ("Laptop", ["Laptop,Premium"], (45000, 90000)),
+    "P102": ("Mouse", ["Mouse,Wireless"], (200, 1200)),
+    "P103": ("Keyboard", ["Keyboard,Mechanical"], (800, 3500)),
+    "P104": ("Monitor", ["Monitor,LED"], (8000, 25000)),
+    "P105": ("Webcam", ["Webcam,HD"], (1500, 5000)),
+    "P106": ("Headphones", [], (1000, 8000)),
+    "P107": ("USB Cable", [], (100, 500)),
+    "P108": ("External Hard Drive", ["External Hard Drive,1TB"], (3000, 9000)),
+    "P109": ("Wireless Mouse", ["Wireless Mouse,Gaming"], (500, 1800)),
+    "P110": ("Laptop Charger", ["Laptop Charger,65W"], (1200, 3000)),
+}
+
+REGIONS = ["North", "South", "East", "West"]
+
+# Share of rows carrying each dirty-data pattern seen in data/sales_data.txt
+DIRTY_RATES = {
+    "comma_thousands": 0.08,   # UnitPrice written as "1,916"
+    "comma_in_name": 0.20,     # ProductName "Laptop,Premium"
+    "zero_quantity": 0.02,
+    "negative_price": 0.02,
+    "bad_transaction_id": 0.03,  # "X611" instead of "T..."
+    "missing_customer": 0.02,
+    "missing_region": 0.01,
+    "malformed_row": 0.005,    # wrong number of fields
+    "blank_line": 0.005,
+}
+
+
+def generate_rows(rows, seed=42, customers=None, days=365, dirty_rates=None):
+    """
+    Yields pipe-delimited sales lines with realistic dirty data.
+
+    Args:
+        rows (int): number of data lines to produce
+        seed (int): random seed; the same seed always gives the same data
+        customers (int): number of distinct customers (default: rows // 20)
+        days (int): number of distinct dates, starting 2024-01-01
+        dirty_rates (dict): overrides for DIRTY_RATES
+
+    Yields:
+        str: one line including the trailing newline
+    """
+
+    rng = random.Random(seed)
+    rates = dict(DIRTY_RATES, **(dirty_rates or {}))
+    customers = customers or max(1, rows // 20)
+
+    # Precompute dates as strings once
+    dates = []
+    year, month, day = 2024, 1, 1
+    month_days = [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    for _ in range(days):
+        dates.append(f"{year:04d}-{month:02d}-{day:02d}")
+        day += 1
+        if day > month_days[month - 1]:
+            day, month = 1, month + 1
+            if month > 12:
+                month, year = 1, year + 1
+                month_days[1] = 29 if year % 4 == 0 and (year % 100 or year % 400 == 0) else 28
+
+    products = list(PRODUCTS.items())
+    random_ = rng.random
+    randint = rng.randint
+
+    for index in range(1, rows + 1):
+        if random_() < rates["blank_line"]:
+            yield "\n"
+            continue
+
+        product_id, (name, variants, (low, high)) = products[randint(0, len(products) - 1)]
+        if variants and random_() < rates["comma_in_name"]:
+            name = variants[randint(0, len(variants) - 1)]
+
+        quantity = 0 if random_() < rates["zero_quantity"] else randint(1, 10)
+        price = randint(low, high)
+        if random_() < rates["negative_price"]:
+            price = -price
+        price = f"{price:,}" if random_() < rates["comma_thousands"] else str(price)
+
+        transaction_id = f"X{index}" if random_() < rates["bad_transaction_id"] else f"T{index:03d}"
+        customer_id = "" if random_() < rates["missing_customer"] else f"C{randint(1, customers):03d}"
+        region = "" if random_() < rates["missing_region"] else REGIONS[randint(0, 3)]
+        date = dates[randint(0, days - 1)]
+
+        if random_() < rates["malformed_row"]:
+            yield f"{transaction_id}|{date}|{product_id}|{name}|{quantity}\n"
+            continue
+
+        yield f"{transaction_id}|{date}|{product_id}|{name}|{quantity}|{price}|{customer_id}|{region}\n"
+
+
+def generate_sales_file(path, rows, seed=42, **options):
+    """
+    Writes a synthetic sales_data.txt-style file in constant memory.
+
+    Returns:
+        str: the path written
+    """
+
+    with open(path, "w", encoding="utf-8", buffering=1024 * 1024) as file:
+        file.write(HEADER)
+        batch = []
+        for line in generate_rows(rows, seed, **options):
+            batch.append(line)
+            if len(batch) >= 10000:
+                file.write("".join(batch))
+                batch.clear()
+        file.write("".join(batch))
+
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic pipe-delimited sales data")
+    parser.add_argument("output", help="file to write")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--customers", type=int, default=None)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    generate_sales_file(args.output, args.rows, args.seed, customers=args.customers, days=args.days)
+    print(f"Wrote {args.rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
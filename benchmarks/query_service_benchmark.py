@@ -0,0 +1,139 @@
+# benchmarks/query_service_benchmark.py
+
+# Query Service Latency / Throughput Benchmark
+#
+# Usage (from the project root):
+#   python -m benchmarks.query_service_benchmark --rows 100000 --requests 2000 --clients 4
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+from benchmarks.data_generator import generate_sales_file
+from benchmarks.run_benchmarks import DEFAULT_DATA_DIR
+from utils.query_service import QueryService, make_handler
+
+
+def workload(regions):
+    """
+    The request mix: every endpoint, unfiltered and per region.
+    """
+
+    paths = ["/region-sales", "/top-products?n=5", "/customers?n=10", "/daily-trend"]
+    for region in regions:
+        paths += [
+            f"/region-sales?region={region}",
+            f"/top-products?n=5&region={region}",
+            f"/customers?n=10&region={region}&min_amount=1000",
+            f"/transactions?region={region}&min_amount=5000&max_amount=50000&limit=50"
+        ]
+    return paths
+
+
+def latency_stats(latencies, elapsed):
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+
+    return {
+        "requests": len(latencies),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else None
+    }
+
+
+def run_client(port, paths, latencies):
+    # One keep-alive connection per client, like a dashboard polling the service
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                raise RuntimeError(f"{path} returned {response.status}")
+    finally:
+        connection.close()
+
+
+def run_phase(port, paths, clients):
+    latencies = []
+    share = [paths[i::clients] for i in range(clients)]
+    threads = [threading.Thread(target=run_client, args=(port, chunk, latencies)) for chunk in share]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return latency_stats(latencies, elapsed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the HTTP query service")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per warm phase")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent keep-alive clients")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    path = os.path.join(args.data_dir, f"sales_{args.rows}_{args.seed}.txt")
+    if not os.path.exists(path):
+        generate_sales_file(path, args.rows, args.seed)
+
+    start = time.perf_counter()
+    service = QueryService(path)
+    load_seconds = time.perf_counter() - start
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_port
+
+    paths = workload(service.dataset.index.regions)
+    warm = (paths * (args.requests // len(paths) + 1))[:args.requests]
+
+    try:
+        report = {
+            "rows": len(service.dataset.index),
+            "load_seconds": round(load_seconds, 3),
+            "distinct_queries": len(paths),
+            # First sight of each query: filter aggregation plus JSON encoding
+            "cold": run_phase(port, paths, 1),
+            # Every query answered from the response cache
+            "warm_sequential": run_phase(port, warm, 1),
+            "warm_concurrent": dict(run_phase(port, warm, args.clients), clients=args.clients),
+            "cache": {"hits": service.cache_hits, "misses": service.cache_misses}
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
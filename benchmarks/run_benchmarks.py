@@ -0,0 +1,381 @@
+# benchmarks/run_benchmarks.py
+
+# Pipeline Benchmark Suite
+#
+# Usage (from the project root):
+#   python -m benchmarks.run_benchmarks --rows 10000 100000 --output bench.json
+#   python -m benchmarks.run_benchmarks --rows 100000 --save-baseline
+#   python -m benchmarks.run_benchmarks --rows 100000 --fail-on-regression
+#   python -m benchmarks.run_benchmarks --rows 100000000   (streamed, see run_streaming)
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then reported as null
+    resource = None
+
+from benchmarks.data_generator import PRODUCTS, generate_sales_file
+
+from utils.file_handler import (
+    read_sales_data,
+    parse_transactions,
+    validate_and_filter,
+    stream_transactions,
+    iter_valid_transactions
+)
+from utils.data_processor import (
+    aggregate_transactions,
+    new_aggregates,
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products
+)
+from utils.api_handler import enrich_sales_data, save_enriched_data
+from utils.memo import RESULT_CACHE
+from main import generate_sales_report
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+DEFAULT_DATA_DIR = "benchmarks/data"
+
+# Above this many rows the materialized pipeline would hold several full
+# lists of rows at once (about 0.5 GB per million rows), so larger sizes
+# run the constant-memory streamed pipeline instead
+MATERIALIZED_ROW_LIMIT = 2_000_000
+
+# Distinct customers generated for streamed sizes. The generator's default
+# (one per 20 rows) would give 5M customers at 100M rows, and per-customer
+# state alone would no longer fit in normal memory
+STREAMED_CUSTOMER_LIMIT = 100_000
+
+
+class RSSSampler:
+    """
+    Tracks peak resident set size between reset() and peak().
+
+    Samples /proc/self/statm from a background thread; where /proc is not
+    available it falls back to the process-lifetime ru_maxrss, and where
+    neither is (Windows) available is False and peak() returns None.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._has_proc = os.path.exists("/proc/self/statm")
+        self.available = self._has_proc or resource is not None
+        self._peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self):
+        if not self.available:
+            return 0
+        if self._has_proc:
+            with open("/proc/self/statm") as file:
+                return int(file.read().split()[1]) * self._page_size
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, self.current())
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def reset(self):
+        self._peak = self.current()
+
+    def peak(self):
+        if not self.available:
+            return None
+        self._peak = max(self._peak, self.current())
+        return self._peak
+
+
+def _count(result):
+    # Rows produced by a stage, for rows_out
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 1
+
+
+def _product_mapping():
+    # Half the catalog matches, so enrichment exercises both paths
+    mapping = {}
+    for product_id in sorted(PRODUCTS)[::2]:
+        mapping[int(product_id[1:])] = {
+            "title": PRODUCTS[product_id][0],
+            "category": "electronics",
+            "brand": "Generic",
+            "rating": 4.2
+        }
+    return mapping
+
+
+def _stage_meter(sampler, repeat, results):
+    # Returns measure(stage, rows_in, func), which runs func repeat times,
+    # appends the fastest run to results and returns its result
+
+    def measure(stage, rows_in, func):
+        # rows_in=None means "count the rows the stage returned"
+        best = None
+        for _ in range(repeat):
+            sampler.reset()
+            cpu_start = time.process_time()
+            start = time.perf_counter()
+            # Every stage is timed cold, not served from the result cache
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), RESULT_CACHE.disabled():
+                result = func()
+            seconds = time.perf_counter() - start
+            cpu_seconds = time.process_time() - cpu_start
+            if best is None or seconds < best[0]:
+                best = (seconds, cpu_seconds, sampler.peak(), result)
+
+        seconds, cpu_seconds, peak_rss, result = best
+        if rows_in is None:
+            rows_in = _count(result)
+        results.append({
+            "stage": stage,
+            "seconds": round(seconds, 6),
+            "cpu_seconds": round(cpu_seconds, 6),
+            "rows_in": rows_in,
+            "rows_out": _count(result),
+            "rows_per_sec": round(rows_in / seconds, 1) if seconds else None,
+            "peak_rss_mb": round(peak_rss / (1024 * 1024), 1) if peak_rss is not None else None
+        })
+        return result
+
+    return measure
+
+
+def run_pipeline(path, sampler, repeat=1):
+    """
+    Runs every pipeline stage on one input file and measures it.
+
+    Every stage gets the previous stage's full list of rows, so memory
+    grows with the file; see MATERIALIZED_ROW_LIMIT and run_streaming().
+
+    Returns:
+        list: one result dict per stage
+    """
+
+    results = []
+    state = {}
+    measure = _stage_meter(sampler, repeat, results)
+
+    state["lines"] = measure("read_sales_data", None, lambda: read_sales_data(path))
+
+    state["parsed"] = measure("parse_transactions", len(state["lines"]), lambda: parse_transactions(state["lines"]))
+    del state["lines"]
+
+    valid, _, _ = measure("validate_and_filter", len(state["parsed"]), lambda: validate_and_filter(state["parsed"]))
+    del state["parsed"]
+    rows = len(valid)
+
+    aggregates = measure("aggregate_transactions", rows, lambda: aggregate_transactions(valid))
+    measure("calculate_total_revenue", rows, lambda: calculate_total_revenue(valid))
+    measure("region_wise_sales", rows, lambda: region_wise_sales(valid))
+    measure("top_selling_products", rows, lambda: top_selling_products(valid, n=5))
+    measure("customer_analysis", rows, lambda: customer_analysis(valid))
+    measure("daily_sales_trend", rows, lambda: daily_sales_trend(valid))
+    measure("find_peak_sales_day", rows, lambda: find_peak_sales_day(valid))
+    measure("low_performing_products", rows, lambda: low_performing_products(valid, threshold=10))
+
+    mapping = _product_mapping()
+    enriched = measure("enrich_sales_data", rows, lambda: enrich_sales_data(valid, mapping))
+    measure("save_enriched_data", rows, lambda: save_enriched_data(enriched, "data/enriched_bench.txt"))
+    measure(
+        "generate_sales_report", rows,
+        lambda: generate_sales_report(valid, enriched, "output/sales_report.txt", aggregates=aggregates)
+    )
+
+    return results
+
+
+def run_streaming(path, sampler, repeat=1):
+    """
+    Runs the constant-memory stages on one input file and measures them.
+
+    Rows are streamed from the file through parsing, validation and
+    aggregation without ever being held in a list. Aggregation uses the
+    approximate (sketch) state, whose per-date and per-region distinct
+    counts are fixed-size, so memory depends on the number of distinct
+    customers and products, not on the row count (about 150 MB with
+    STREAMED_CUSTOMER_LIMIT customers). The analytics functions then run
+    on the aggregate state. The list-based stages (enrichment, saving,
+    the report) are skipped.
+
+    Returns:
+        list: one result dict per stage
+    """
+
+    results = []
+    measure = _stage_meter(sampler, repeat, results)
+    summary = {}
+
+    aggregates = measure(
+        "stream_aggregate", None,
+        lambda: aggregate_transactions(
+            iter_valid_transactions(stream_transactions(path), summary=summary), new_aggregates(approximate=True)
+        )
+    )
+    # rows_in was the number of keys in the state; report the rows read instead
+    results[-1]["rows_in"] = summary["total_input"]
+    results[-1]["rows_out"] = aggregates["transaction_count"]
+    if results[-1]["seconds"]:
+        results[-1]["rows_per_sec"] = round(summary["total_input"] / results[-1]["seconds"], 1)
+
+    rows = aggregates["transaction_count"]
+    measure("calculate_total_revenue", rows, lambda: calculate_total_revenue(None, aggregates))
+    measure("region_wise_sales", rows, lambda: region_wise_sales(None, aggregates))
+    measure("top_selling_products", rows, lambda: top_selling_products(None, n=5, aggregates=aggregates))
+    measure("customer_analysis", rows, lambda: customer_analysis(None, aggregates))
+    measure("daily_sales_trend", rows, lambda: daily_sales_trend(None, aggregates))
+    measure("find_peak_sales_day", rows, lambda: find_peak_sales_day(None, aggregates))
+    measure("low_performing_products", rows, lambda: low_performing_products(None, threshold=10, aggregates=aggregates))
+
+    return results
+
+
+def compare_to_baseline(report, baseline, threshold):
+    """
+    Computes per-stage throughput deltas against a saved baseline.
+
+    Returns:
+        list: regression entries whose throughput dropped more than threshold
+    """
+
+    previous = {
+        (entry["rows"], entry["stage"]): entry
+        for entry in baseline.get("results", [])
+    }
+    regressions = []
+
+    for entry in report["results"]:
+        old = previous.get((entry["rows"], entry["stage"]))
+        if not old or not old.get("rows_per_sec") or not entry.get("rows_per_sec"):
+            continue
+
+        delta = (entry["rows_per_sec"] - old["rows_per_sec"]) / old["rows_per_sec"]
+        entry["baseline_rows_per_sec"] = old["rows_per_sec"]
+        entry["throughput_delta_pct"] = round(delta * 100, 2)
+        if entry.get("peak_rss_mb") is not None and old.get("peak_rss_mb") is not None:
+            entry["rss_delta_mb"] = round(entry["peak_rss_mb"] - old["peak_rss_mb"], 1)
+
+        if delta < -threshold:
+            regressions.append({
+                "rows": entry["rows"],
+                "stage": entry["stage"],
+                "throughput_delta_pct": entry["throughput_delta_pct"]
+            })
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every sales pipeline stage")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000],
+                        help="dataset sizes to run (10k up to 100M)")
+    parser.add_argument("--max-materialized-rows", type=int, default=MATERIALIZED_ROW_LIMIT,
+                        help="larger sizes run only the streamed, constant-memory stages")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage; the fastest is kept")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where generated inputs are cached")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="throughput drop treated as a regression (0.10 = 10%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    project_root = os.getcwd()
+    data_dir = os.path.abspath(args.data_dir)
+    os.makedirs(data_dir, exist_ok=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "max_materialized_rows": args.max_materialized_rows
+        },
+        "results": []
+    }
+
+    with RSSSampler() as sampler, tempfile.TemporaryDirectory() as workdir:
+        # Stages write to data/ and output/; keep that away from the real files
+        os.makedirs(os.path.join(workdir, "data"))
+        os.makedirs(os.path.join(workdir, "output"))
+        os.chdir(workdir)
+
+        try:
+            for rows in args.rows:
+                if rows > args.max_materialized_rows:
+                    mode, run = "streamed", run_streaming
+                    customers = min(max(1, rows // 20), STREAMED_CUSTOMER_LIMIT)
+                    path = os.path.join(data_dir, f"sales_{rows}_{args.seed}_c{customers}.txt")
+                else:
+                    mode, run = "materialized", run_pipeline
+                    customers = None
+                    path = os.path.join(data_dir, f"sales_{rows}_{args.seed}.txt")
+
+                if not os.path.exists(path):
+                    generate_sales_file(path, rows, args.seed, customers=customers)
+                for entry in run(path, sampler, args.repeat):
+                    report["results"].append(dict(entry, rows=rows, mode=mode))
+        finally:
+            os.chdir(project_root)
+
+    baseline_path = os.path.abspath(args.baseline)
+    regressions = []
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as file:
+            regressions = compare_to_baseline(report, json.load(file), args.threshold)
+        report["baseline"] = args.baseline
+    report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as file:
+            json.dump({"meta": report["meta"], "results": report["results"]}, file, indent=2)
+
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
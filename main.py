@@ -3,222 +3,47 @@
 # Task 4.1: Generate Comprehensive Text Report
 #==============================================
 
-from datetime import datetime
-from collections import defaultdict
+import argparse
+import asyncio
+import os
 
-def generate_sales_report(transactions, enriched_transactions, output_file="output/sales_report.txt"):
+def generate_sales_report(transactions, enriched_transactions, output_file="output/sales_report.txt",
+                          aggregates=None, formats=("text",)):
     """
     Generates a comprehensive formatted text report
-    """
-
-    # ---------- 2. BASIC METRICS ----------
-    total_transactions = len(transactions)
-    total_revenue = sum(tx["Quantity"] * tx["UnitPrice"] for tx in transactions)
-    avg_order_value = total_revenue / total_transactions if total_transactions else 0
-
-    dates = [tx["Date"] for tx in transactions]
-    start_date = min(dates)
-    end_date = max(dates)
-
-    # ---------- 3. REGION-WISE ----------
-    region_summary = defaultdict(lambda: {"revenue": 0, "count": 0})
-
-    for tx in transactions:
-        region = tx["Region"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
-        region_summary[region]["revenue"] += amount
-        region_summary[region]["count"] += 1
-
-    region_sorted = sorted(
-        region_summary.items(),
-        key=lambda x: x[1]["revenue"],
-        reverse=True
-    )
-
-    # ---------- 4. TOP PRODUCTS ----------
-    product_summary = defaultdict(lambda: {"qty": 0, "revenue": 0})
-
-    for tx in transactions:
-        name = tx["ProductName"]
-        product_summary[name]["qty"] += tx["Quantity"]
-        product_summary[name]["revenue"] += tx["Quantity"] * tx["UnitPrice"]
-
-    top_products = sorted(
-        product_summary.items(),
-        key=lambda x: x[1]["qty"],
-        reverse=True
-    )[:5]
-
-    # ---------- 5. TOP CUSTOMERS ----------
-    customer_summary = defaultdict(lambda: {"spent": 0, "count": 0})
-
-    for tx in transactions:
-        cid = tx["CustomerID"]
-        customer_summary[cid]["spent"] += tx["Quantity"] * tx["UnitPrice"]
-        customer_summary[cid]["count"] += 1
-
-    top_customers = sorted(
-        customer_summary.items(),
-        key=lambda x: x[1]["spent"],
-        reverse=True
-    )[:5]
-
-    # ---------- 6. DAILY SALES ----------
-    daily_summary = defaultdict(lambda: {"revenue": 0, "count": 0, "customers": set()})
-
-    for tx in transactions:
-        date = tx["Date"]
-        daily_summary[date]["revenue"] += tx["Quantity"] * tx["UnitPrice"]
-        daily_summary[date]["count"] += 1
-        daily_summary[date]["customers"].add(tx["CustomerID"])
-
-    daily_sorted = sorted(daily_summary.items())
-
-    # ---------- 7. PRODUCT PERFORMANCE ANALYSIS ----------
-    # Best selling day
-    best_day, best_day_stats = max(
-    daily_summary.items(),
-    key=lambda x: x[1]["revenue"]
-    )
-
-    # Low performing products (quantity < 10)
-    low_products = [
-    (product, stats["qty"], stats["revenue"])
-    for product, stats in product_summary.items()
-    if stats["qty"] < 10
-    ]
-    
-    # Average transaction value per region
-    avg_tx_value_region = {}
-    for region, stats in region_summary.items():
-        avg_tx_value_region[region] = (
-            stats["revenue"] / stats["count"]
-            if stats["count"] else 0
-    )
-
-    # ---------- 8. API ENRICHMENT ----------
-    enriched_success = [tx for tx in enriched_transactions if tx.get("API_Match")]
-    failed_enrichment = [
-        tx["ProductName"] for tx in enriched_transactions if not tx.get("API_Match")
-    ]
-
-    success_rate = (len(enriched_success) / len(enriched_transactions)) * 100 if enriched_transactions else 0
-
-    # ---------- WRITE REPORT ----------
-    with open(output_file, "w", encoding="utf-8") as file:
-
-        # HEADER
-        file.write("=" * 44 + "\n")
-        file.write("           SALES ANALYTICS REPORT\n")
-        file.write(f"     Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        file.write(f"     Records Processed: {total_transactions}\n")
-        file.write("=" * 44 + "\n\n")
-
-        # OVERALL SUMMARY
-        file.write("OVERALL SUMMARY\n")
-        file.write("-" * 44 + "\n")
-        file.write(f"Total Revenue:        ₹{total_revenue:,.2f}\n")
-        file.write(f"Total Transactions:   {total_transactions}\n")
-        file.write(f"Average Order Value:  ₹{avg_order_value:,.2f}\n")
-        file.write(f"Date Range:           {start_date} to {end_date}\n\n")
-
-        # REGION PERFORMANCE
-        file.write("REGION-WISE PERFORMANCE\n")
-        file.write("-" * 44 + "\n")
-        file.write(f"{'Region':10}{'Sales':15}{'% of Total':12}{'Transactions'}\n")
-
-        for region, stats in region_sorted:
-            pct = (stats["revenue"] / total_revenue) * 100
-            file.write(
-                f"{region:10}₹{stats['revenue']:,.2f}   {pct:6.2f}%      {stats['count']}\n"
-            )
-        file.write("\n")
-
-        # TOP PRODUCTS
-        file.write("TOP 5 PRODUCTS\n")
-        file.write("-" * 44 + "\n")
-        file.write(f"{'Rank':5}{'Product':20}{'Qty':8}{'Revenue'}\n")
-
-        for idx, (prod, stats) in enumerate(top_products, 1):
-            file.write(
-                f"{idx:<5}{prod:20}{stats['qty']:<8}₹{stats['revenue']:,.2f}\n"
-            )
-        file.write("\n")
-
-        # TOP CUSTOMERS
-        file.write("TOP 5 CUSTOMERS\n")
-        file.write("-" * 44 + "\n")
-        file.write(f"{'Rank':5}{'Customer':12}{'Spent':15}{'Orders'}\n")
-
-        for idx, (cid, stats) in enumerate(top_customers, 1):
-            file.write(
-                f"{idx:<5}{cid:12}₹{stats['spent']:,.2f}   {stats['count']}\n"
-            )
-        file.write("\n")
-
-        # DAILY SALES
-        file.write("DAILY SALES TREND\n")
-        file.write("-" * 44 + "\n")
-        file.write(f"{'Date':12}{'Revenue':15}{'Txns':8}{'Customers'}\n")
-
-        for date, stats in daily_sorted:
-            file.write(
-                f"{date:12}₹{stats['revenue']:,.2f}   {stats['count']:<8}{len(stats['customers'])}\n"
-            )
-        file.write("\n")
-        
-        # PRODUCT PERFORMANCE
-
-        file.write("PRODUCT PERFORMANCE ANALYSIS\n")
-        file.write("-" * 44 + "\n")
-
-        file.write(f"Best Selling Day:\n")
-        file.write(
-            f"{best_day} | Revenue: ₹{best_day_stats['revenue']:,.2f} "
-            f"| Transactions: {best_day_stats['count']}\n\n"
-        )
-
-        file.write("Low Performing Products (Quantity < 10):\n")
-
-        if low_products:
-           for prod, qty, rev in sorted(low_products, key=lambda x: x[1]):
-               file.write(
-                   f"- {prod} | Qty: {qty} | Revenue: ₹{rev:,.2f}\n"
-        )
-        else:
-            file.write("None\n")
 
-        file.write("\nAverage Transaction Value per Region:\n")
-        for region, avg_val in avg_tx_value_region.items():
-            file.write(
-                f"- {region}: ₹{avg_val:,.2f}\n"
-        )
-
-        file.write("\n")
+    The report model is computed once; each requested format (text, json,
+    csv, html) is rendered from it and written next to output_file.
+    """
 
-        # API SUMMARY
-        file.write("API ENRICHMENT SUMMARY\n")
-        file.write("-" * 44 + "\n")
-        file.write(f"Enriched Records: {len(enriched_success)}\n")
-        file.write(f"Success Rate:    {success_rate:.2f}%\n")
-        file.write("Unmatched Products:\n")
+    if aggregates is None:
+        aggregates = aggregate_transactions(transactions)
 
-        for prod in sorted(set(failed_enrichment)):
-            file.write(f"- {prod}\n")
+    model = build_report_model(transactions, enriched_transactions, aggregates)
 
-    print(f"Sales report generated successfully at: {output_file}")
+    for fmt in formats:
+        path = output_file if fmt == "text" else report_path(output_file, fmt)
+        write_report(model, path, fmt)
+        print(f"Sales report generated successfully at: {path}")
 
 
 
 # -------- Part 1 imports --------
 from utils.file_handler import (
-    read_sales_data,
-    parse_transactions,
-    validate_and_filter
+    stream_transactions,
+    display_filter_summary
 )
+from utils.filter_index import TransactionIndex
+from utils.incremental import incremental_aggregate
+from utils.parallel_processor import parallel_load
+from utils.dataset import PartitionedDataset
+from utils.memo import RESULT_CACHE
+from utils.parsed_cache import load_parsed_cache, save_parsed_cache, source_key
+from utils.transaction_table import TransactionTable
 
 # -------- Part 2 imports --------
 from utils.data_processor import (
+    aggregate_transactions,
     calculate_total_revenue,
     region_wise_sales,
     top_selling_products,
@@ -236,11 +61,55 @@ from utils.api_handler import (
     save_enriched_data
 )
 
-# -------- Part 4 import --------
-from utils.api_handler import generate_sales_report
+from utils.instrumentation import PipelineMetrics
+from utils.async_pipeline import BackgroundStage, routed_stdout
+from utils.sales_store import SalesStore
+from utils.report import RENDERERS, build_report_model, report_path, write_report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sales Analytics System")
+    parser.add_argument("--input", default="data/sales_data.txt",
+                        help="sales file, directory, glob or region=/date= partitioned layout")
+    parser.add_argument("--metrics-json", default="output/pipeline_metrics.json",
+                        help="where to write the per-stage metrics summary (JSON)")
+    parser.add_argument("--metrics-prom", default="output/pipeline_metrics.prom",
+                        help="where to write the metrics in Prometheus textfile format")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="aggregate with N worker processes (byte ranges of a file, or whole files)")
+    parser.add_argument("--no-parse-cache", action="store_true",
+                        help="always re-read and re-parse the sales file")
+    parser.add_argument("--store-db", metavar="PATH",
+                        help="also load transactions, catalog and rollups into this SQLite file")
+    parser.add_argument("--report-format", action="append", choices=sorted(RENDERERS),
+                        help="report format(s) to write (repeatable, default: text)")
+    parser.add_argument("--trace-alloc", action="store_true",
+                        help="record per-stage allocations with tracemalloc (slower)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with routed_stdout() as router:
+        asyncio.run(run_pipeline(args, router))
+
+
+async def run_pipeline(args, router=None):
+    """
+    Runs the [1/10]..[10/10] pipeline.
+
+    The catalog fetch is network-bound, so it starts in a worker thread
+    before anything else and is only joined at the enrichment step; the
+    file is read, parsed, validated and analyzed while it is in flight.
+    """
 
+    metrics = PipelineMetrics(trace_allocations=args.trace_alloc)
+    timed = metrics.instrument
+    status = "error"
+
+    # Start the API fetch at t=0; its output is replayed at [6/10]
+    catalog_fetch = BackgroundStage("fetch_all_products", fetch_all_products).start(router)
 
-def main():
     try:
         # ==========================================================
         # HEADER
@@ -253,31 +122,126 @@ def main():
         # [1/10] READ SALES DATA
         # ==========================================================
         print("\n[1/10] Reading sales data...")
-        file_path = "data/sales_data.txt"
-        raw_lines = read_sales_data(file_path)
-        print(f"Successfully read {len(raw_lines)} transactions")
+        file_path = args.input
+        single_file = os.path.isfile(file_path)
+
+        # Validated rows from an earlier run of the same file skip [1/10]..[3/10]
+        cached = None
+        if single_file and not args.no_parse_cache:
+            with metrics.stage("load_parsed_cache") as stage:
+                cached = load_parsed_cache(file_path)
+                stage["rows_out"] = len(cached[0]) if cached else 0
+
+        # The file is identified before it is read, so rows parsed from
+        # it are never cached under the key of a later, appended version
+        if single_file and not cached and not args.no_parse_cache:
+            cache_key = source_key(file_path)
+
+        # With --workers, [1/10]..[3/10] and the aggregation all happen in
+        # one parallel pass: the file (byte ranges) or dataset (files) is
+        # read, parsed, validated and aggregated across processes, and the
+        # valid rows come back for enrichment
+        aggregates = None
+        if cached:
+            table, counts = cached
+            print(f"Successfully read {counts['lines']} transactions")
+        elif args.workers:
+            with metrics.stage("parallel_load") as stage:
+                if single_file:
+                    aggregates, load_summary, valid_rows = parallel_load(file_path, workers=args.workers)
+                else:
+                    aggregates, load_summary, valid_rows = PartitionedDataset(file_path).load(workers=args.workers)
+                stage["rows_out"] = len(valid_rows)
+            line_count = load_summary.get("lines", 0)
+            parsed_count = load_summary["total_input"]
+            if single_file:
+                print(f"Successfully read {line_count} transactions")
+            else:
+                print(f"Successfully read {line_count} transactions from {load_summary['files_read']} files")
+        elif not single_file:
+            # Directory / glob / partitioned input: files are read and parsed together
+            with metrics.stage("read_dataset") as stage:
+                parsed_transactions, read_info = PartitionedDataset(file_path).read()
+                stage["rows_out"] = len(parsed_transactions)
+            parsed_count = len(parsed_transactions)
+            print(f"Successfully read {read_info['lines']} transactions from {read_info['files_read']} files")
+        else:
+            # Lines are parsed as they are read; only the parsed rows are kept
+            read_counts = {}
+            with metrics.stage("read_and_parse") as stage:
+                parsed_transactions = list(stream_transactions(file_path, read_counts))
+                stage["rows_out"] = len(parsed_transactions)
+            line_count = read_counts["lines"]
+            parsed_count = len(parsed_transactions)
+            print(f"Successfully read {line_count} transactions")
 
         # ==========================================================
         # [2/10] PARSE & CLEAN
         # ==========================================================
         print("\n[2/10] Parsing and cleaning data...")
-        parsed_transactions = parse_transactions(raw_lines)
-        print(f"Parsed {len(parsed_transactions)} records")
+        # Files are parsed as they are read in [1/10]
+        if cached:
+            print(f"Parsed {counts['parsed']} records")
+        else:
+            print(f"Parsed {parsed_count} records")
 
         # ==========================================================
         # [3/10] VALIDATE DATA (internal)
         # ==========================================================
-        valid_transactions, invalid_count, summary = validate_and_filter(parsed_transactions)
+        # Validate once and index by region / amount so filter
+        # requests are answered by binary search instead of rescans
+        if cached:
+            with metrics.stage("validate_and_filter", counts["parsed"]) as stage:
+                filter_index = TransactionIndex.from_validated(
+                    table.iter_rows(), counts["total_input"], counts["invalid"],
+                    counts.get("rejected_by_rule")
+                )
+                valid_transactions, invalid_count, summary = filter_index.query()
+                stage["rows_out"] = len(valid_transactions)
+        elif args.workers:
+            # Already validated by the workers
+            with metrics.stage("validate_and_filter", parsed_count) as stage:
+                filter_index = TransactionIndex.from_validated(
+                    valid_rows, load_summary["total_input"], load_summary["invalid"],
+                    load_summary["rejected_by_rule"]
+                )
+                valid_transactions, invalid_count, summary = filter_index.query()
+                stage["rows_out"] = len(valid_transactions)
+        else:
+            with metrics.stage("validate_and_filter", parsed_count) as stage:
+                filter_index = TransactionIndex(parsed_transactions)
+                valid_transactions, invalid_count, summary = filter_index.query()
+                stage["rows_out"] = len(valid_transactions)
+
+        if single_file and not cached and not args.no_parse_cache:
+            with metrics.stage("save_parsed_cache", len(filter_index)):
+                save_parsed_cache(
+                    file_path,
+                    cache_key,
+                    TransactionTable.from_transactions(filter_index.transactions),
+                    {
+                        "lines": line_count,
+                        "parsed": parsed_count,
+                        "total_input": filter_index.total_input,
+                        "invalid": filter_index.invalid,
+                        "rejected_by_rule": filter_index.rejected_by_rule
+                    }
+                )
+
+        display_filter_summary(
+            filter_index.regions,
+            filter_index.min_amount,
+            filter_index.max_amount,
+            summary["final_count"]
+        )
+        metrics.counters["rejected_by_rule"] = summary["rejected_by_rule"]
 
         # ==========================================================
         # [4/10] SHOW FILTER OPTIONS (based on VALID data)
         # ==========================================================
         print("\n[3/10] Filter Options Available:")
-        regions = sorted({tx["Region"] for tx in valid_transactions})
-        amounts = [tx["Quantity"] * tx["UnitPrice"] for tx in valid_transactions]
-
-        print("Regions:", ", ".join(regions))
-        print(f"Amount Range: {int(min(amounts))} - {int(max(amounts))}")
+        print("Regions:", ", ".join(filter_index.regions))
+        print(f"Amount Range: {int(filter_index.min_amount)} - {int(filter_index.max_amount)}")
 
         choice = "n"
         print("\nDo you want to filter data? (y/n): n")
@@ -293,13 +257,30 @@ def main():
         # ==========================================================
         print("\n[5/10] Analyzing sales data...")
 
-        total_revenue = calculate_total_revenue(valid_transactions)
-        region_sales = region_wise_sales(valid_transactions)
-        top_products = top_selling_products(valid_transactions, n=5)
-        customer_stats = customer_analysis(valid_transactions)
-        daily_trend = daily_sales_trend(valid_transactions)
-        peak_day = find_peak_sales_day(valid_transactions)
-        low_products = low_performing_products(valid_transactions, threshold=10)
+        with metrics.stage("analyze_sales_data", len(valid_transactions)):
+            # One pass over the data; every metric below is a view over it.
+            # The parallel load already aggregated; otherwise a single file
+            # is aggregated incrementally, reading only the rows appended
+            # since the state saved by the previous run
+            if aggregates is None and single_file:
+                try:
+                    aggregates, _, run_info = timed(incremental_aggregate)(file_path)
+                    metrics.counters["incremental"] = run_info
+                except OSError as e:
+                    print(f"Incremental aggregation unavailable: {e}")
+            # The input changed after it was read: stay consistent with the rows
+            if aggregates is not None and aggregates["transaction_count"] != len(valid_transactions):
+                aggregates = None
+            if aggregates is None:
+                aggregates = timed(aggregate_transactions)(valid_transactions)
+
+            total_revenue = timed(calculate_total_revenue)(valid_transactions, aggregates)
+            region_sales = timed(region_wise_sales)(valid_transactions, aggregates)
+            top_products = timed(top_selling_products)(valid_transactions, n=5, aggregates=aggregates)
+            customer_stats = timed(customer_analysis)(valid_transactions, aggregates)
+            daily_trend = timed(daily_sales_trend)(valid_transactions, aggregates)
+            peak_day = timed(find_peak_sales_day)(valid_transactions, aggregates)
+            low_products = timed(low_performing_products)(valid_transactions, threshold=10, aggregates=aggregates)
 
         print("Analysis complete")
 
@@ -307,15 +288,25 @@ def main():
         # [7/10] FETCH API PRODUCTS
         # ==========================================================
         print("\n[6/10] Fetching product data from API...")
-        api_products = fetch_all_products()
+        with metrics.stage("wait_for_catalog") as stage:
+            api_products = await catalog_fetch.join()
+            stage["rows_out"] = len(api_products)
+        metrics.record(
+            catalog_fetch.name,
+            catalog_fetch.wall_seconds,
+            catalog_fetch.cpu_seconds,
+            rows_out=len(api_products)
+        )
         print(f"Fetched {len(api_products)} products")
 
         # ==========================================================
         # [8/10] ENRICH SALES DATA
         # ==========================================================
         print("\n[7/10] Enriching sales data...")
-        product_mapping = create_product_mapping(api_products)
-        enriched_transactions = enrich_sales_data(valid_transactions, product_mapping)
+        with metrics.stage("enrich_sales_data", len(valid_transactions)) as stage:
+            product_mapping = create_product_mapping(api_products)
+            enriched_transactions = enrich_sales_data(valid_transactions, product_mapping)
+            stage["rows_out"] = len(enriched_transactions)
 
         success_count = sum(1 for tx in enriched_transactions if tx["API_Match"])
         success_rate = (success_count / len(enriched_transactions)) * 100
@@ -329,30 +320,48 @@ def main():
         # [9/10] SAVE ENRICHED DATA
         # ==========================================================
         print("\n[8/10] Saving enriched data...")
-        save_enriched_data(enriched_transactions)
+        with metrics.stage("save_enriched_data", len(enriched_transactions)):
+            save_enriched_data(enriched_transactions)
         print("Saved to: data/enriched_sales_data.txt")
 
+        if args.store_db:
+            with metrics.stage("store_sqlite", len(valid_transactions)) as stage:
+                with SalesStore(args.store_db) as store:
+                    stage["rows_out"] = store.ingest(valid_transactions, replace=True, aggregates=aggregates)
+                    store.save_products(product_mapping)
+            print(f"Stored {stage['rows_out']} transactions in: {args.store_db}")
+
         # ==========================================================
         # [10/10] GENERATE REPORT
         # ==========================================================
         print("\n[9/10] Generating report...")
-        generate_sales_report(
-            valid_transactions,
-            enriched_transactions,
-            output_file="output/sales_report.txt"
-        )
-        print("Report saved to: output/sales_report.txt")
+        with metrics.stage("generate_sales_report", len(valid_transactions)):
+            generate_sales_report(
+                valid_transactions,
+                enriched_transactions,
+                output_file="output/sales_report.txt",
+                aggregates=aggregates,
+                formats=args.report_format or ("text",)
+            )
 
         # ==========================================================
         # COMPLETION
         # ==========================================================
         print("\n[10/10] Process Complete!")
         print("=" * 40)
+        status = "ok"
 
     except Exception as e:
         print("\nERROR OCCURRED")
         print(str(e))
 
+    finally:
+        metrics.counters["result_cache"] = RESULT_CACHE.stats()
+        try:
+            metrics.write(args.metrics_json, args.metrics_prom, status)
+        except OSError as e:
+            print(f"Failed to write pipeline metrics: {e}")
+
 
 if __name__ == "__main__":
     main()
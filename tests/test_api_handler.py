@@ -0,0 +1,226 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+from utils.api_handler import fetch_all_products, load_catalog_snapshot, save_catalog_snapshot
+
+
+class CatalogStub:
+    """
+    Local DummyJSON-style /products endpoint.
+
+    Serves total products in skip/limit pages, never more than max_limit
+    per page, with a fixed ETag and / or Last-Modified; a matching
+    If-None-Match, or If-Modified-Since when there is no ETag, gets a 304.
+    The 304 repeats the validators unless validators_on_304 is False.
+    failures maps a skip offset to how many times that page answers 503.
+    Every request is recorded as (query params, headers).
+    """
+
+    def __init__(self, total=250, max_limit=30, etag='"catalog-v1"', last_modified=None,
+                 validators_on_304=True):
+        self.total = total
+        self.max_limit = max_limit
+        self.etag = etag
+        self.last_modified = last_modified
+        self.validators_on_304 = validators_on_304
+        self.failures = {}
+        self.requests = []
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def send_validators(self):
+                if stub.etag:
+                    self.send_header("ETag", stub.etag)
+                if stub.last_modified:
+                    self.send_header("Last-Modified", stub.last_modified)
+
+            def not_modified(self):
+                if stub.etag:
+                    return self.headers.get("If-None-Match") == stub.etag
+                return bool(stub.last_modified) and self.headers.get("If-Modified-Since") == stub.last_modified
+
+            def do_GET(self):
+                params = dict(parse_qsl(urlsplit(self.path).query))
+                skip = int(params.get("skip", 0))
+                with stub._lock:
+                    stub.requests.append((params, dict(self.headers)))
+                    failing = stub.failures.get(skip, 0)
+                    if failing:
+                        stub.failures[skip] = failing - 1
+                if failing:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if self.not_modified():
+                    self.send_response(304)
+                    if stub.validators_on_304:
+                        self.send_validators()
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                limit = min(int(params.get("limit", 30)), stub.max_limit)
+                products = [
+                    {"id": i, "title": f"Product {i}", "category": "stub", "brand": "Stub", "rating": 4.5}
+                    for i in range(skip + 1, min(skip + limit, stub.total) + 1)
+                ]
+                body = json.dumps({"products": products, "total": stub.total, "skip": skip, "limit": limit}).encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_validators()
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/products"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = CatalogStub()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def last_modified_stub():
+    # Validates on Last-Modified only and does not repeat it on a 304
+    server = CatalogStub(etag=None, last_modified="Wed, 01 Jan 2025 00:00:00 GMT", validators_on_304=False)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / "product_catalog.json")
+
+
+def write_snapshot(cache_file, url, age, products, etag='"catalog-v1"', last_modified=None):
+    save_catalog_snapshot({
+        "url": url,
+        "fetched_at": time.time() - age,
+        "etag": etag,
+        "last_modified": last_modified,
+        "products": products
+    }, cache_file)
+
+
+def test_cold_run_fetches_and_saves_snapshot(stub, cache_file):
+    products = fetch_all_products(stub.url, cache_file)
+
+    assert len(products) == stub.total
+    snapshot = load_catalog_snapshot(cache_file)
+    assert snapshot["products"] == products
+    assert snapshot["etag"] == stub.etag
+
+
+def test_warm_run_makes_no_requests(stub, cache_file):
+    cached = [{"id": 1, "title": "Cached"}]
+    write_snapshot(cache_file, stub.url, age=60, products=cached)
+
+    assert fetch_all_products(stub.url, cache_file, ttl=3600) == cached
+    assert stub.requests == []
+
+
+def test_stale_snapshot_is_served_and_revalidated_in_background(stub, cache_file):
+    cached = [{"id": 1, "title": "Cached"}]
+    write_snapshot(cache_file, stub.url, age=7200, products=cached)
+    fetched_at = load_catalog_snapshot(cache_file)["fetched_at"]
+
+    # Returned at once, before the revalidation completes
+    assert fetch_all_products(stub.url, cache_file, ttl=3600, max_stale=86400) == cached
+
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        snapshot = load_catalog_snapshot(cache_file)
+        if snapshot["fetched_at"] > fetched_at:
+            break
+        time.sleep(0.02)
+    else:
+        pytest.fail("snapshot was not revalidated")
+
+    # One conditional request answered 304: products kept, timestamp renewed
+    assert len(stub.requests) == 1
+    assert stub.requests[0][1].get("If-None-Match") == stub.etag
+    assert snapshot["products"] == cached
+
+
+def test_304_without_validators_keeps_snapshot_validators(last_modified_stub, cache_file):
+    last_modified = last_modified_stub.last_modified
+    cached = [{"id": 1, "title": "Cached"}]
+    write_snapshot(cache_file, last_modified_stub.url, age=7200, products=cached,
+                   etag=None, last_modified=last_modified)
+
+    assert fetch_all_products(last_modified_stub.url, cache_file, ttl=3600, max_stale=0) == cached
+    snapshot = load_catalog_snapshot(cache_file)
+    assert snapshot["last_modified"] == last_modified
+
+    # Expire the renewed snapshot: the next refresh must still be conditional
+    write_snapshot(cache_file, last_modified_stub.url, age=7200, products=snapshot["products"],
+                   etag=snapshot["etag"], last_modified=snapshot["last_modified"])
+    assert fetch_all_products(last_modified_stub.url, cache_file, ttl=3600, max_stale=0) == cached
+
+    assert [headers.get("If-Modified-Since") for _, headers in last_modified_stub.requests] == [last_modified] * 2
+
+
+def test_offline_falls_back_to_last_good_snapshot(stub, cache_file):
+    url = stub.url
+    stub.close()
+    cached = [{"id": 1, "title": "Cached"}]
+    write_snapshot(cache_file, url, age=30 * 86400, products=cached)
+
+    assert fetch_all_products(url, cache_file, ttl=3600, max_stale=86400, timeout=1) == cached
+
+
+def test_offline_without_snapshot_returns_empty_list(stub, cache_file):
+    url = stub.url
+    stub.close()
+
+    assert fetch_all_products(url, cache_file, timeout=1) == []
+    assert not os.path.exists(cache_file)
+
+
+def test_pages_through_capped_page_limit(stub, cache_file):
+    # 100 per page is requested, but the server caps pages at 30
+    products = fetch_all_products(stub.url, cache_file, page_size=100, concurrency=4)
+
+    assert [product["id"] for product in products] == list(range(1, stub.total + 1))
+    skips = sorted(int(params["skip"]) for params, _ in stub.requests)
+    assert skips == list(range(0, stub.total, stub.max_limit))
+
+
+def test_transient_page_error_is_retried(stub, cache_file):
+    stub.failures[60] = 1
+
+    products = fetch_all_products(stub.url, cache_file, page_size=30)
+
+    assert [product["id"] for product in products] == list(range(1, stub.total + 1))
+    assert [int(params["skip"]) for params, _ in stub.requests].count(60) == 2
+
+
+def test_failing_page_does_not_save_partial_catalog(stub, cache_file):
+    stub.failures[90] = 100
+
+    assert fetch_all_products(stub.url, cache_file, page_size=30) == []
+    assert not os.path.exists(cache_file)
@@ -3,32 +3,262 @@
 # Task 3.1: Fetch Product Details
 
 # a) Fetch All Products
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for .zst output
+    zstandard = None
+
+from utils.transaction import FIELDS, ENRICHMENT_FIELDS, Transaction, EnrichedTransaction
+
+CATALOG_URL = "https://dummyjson.com/products"
+CATALOG_PAGE_SIZE = 100
+CATALOG_CONCURRENCY = 8
+CATALOG_RETRIES = 3
+CATALOG_CACHE_FILE = "data/product_catalog.json"
+CATALOG_TTL = 24 * 60 * 60          # serve from cache without any request
+CATALOG_MAX_STALE = 7 * 24 * 60 * 60  # serve stale copy while refreshing in background
+WRITE_BUFFER_ROWS = 16384
+
+
+def load_catalog_snapshot(cache_file=CATALOG_CACHE_FILE):
+    """
+    Loads the last good product catalog snapshot from disk.
 
-def fetch_all_products():
+    Returns:
+        dict: snapshot with products, fetched_at, etag, last_modified and url,
+              or None if no readable snapshot exists
+    """
+
+    try:
+        with open(cache_file, "r", encoding="utf-8") as file:
+            snapshot = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(snapshot, dict) or "products" not in snapshot:
+        return None
+
+    return snapshot
+
+
+def save_catalog_snapshot(snapshot, cache_file=CATALOG_CACHE_FILE):
+    """
+    Atomically writes a product catalog snapshot to disk.
+    """
+
+    directory = os.path.dirname(cache_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file)
+    os.replace(temp_file, cache_file)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size=CATALOG_CONCURRENCY, retries=CATALOG_RETRIES):
+    """
+    Returns a shared keep-alive HTTP session with retries.
+
+    Connection errors and 429 / 5xx replies are retried with exponential
+    backoff (0.5s, 1s, 2s, ...), honouring Retry-After when present.
+    """
+
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+            _session = requests.Session()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+
+        return _session
+
+
+def fetch_catalog_page(url, skip, limit, timeout=10, headers=None, session=None):
+    """
+    Fetches one page of the catalog.
+
+    Returns:
+        requests.Response: the page response (status already checked, except 304)
+    """
+
+    session = session or get_session()
+    response = session.get(
+        url,
+        params={"limit": limit, "skip": skip},
+        headers=headers,
+        timeout=timeout
+    )
+
+    if response.status_code != 304:
+        response.raise_for_status()
+
+    return response
+
+
+def refresh_catalog(url=CATALOG_URL, snapshot=None, cache_file=CATALOG_CACHE_FILE, timeout=10,
+                    page_size=CATALOG_PAGE_SIZE, concurrency=CATALOG_CONCURRENCY):
+    """
+    Fetches the full catalog page by page, revalidating an existing snapshot.
+
+    The first page is requested with If-None-Match / If-Modified-Since from
+    the snapshot; a 304 reply keeps the cached products and only renews the
+    snapshot timestamp. Otherwise its "total" is used to request the
+    remaining skip/limit pages concurrently over the pooled session, and
+    pages are joined in order.
+
+    Returns:
+        list: product dictionaries
+
+    Raises:
+        requests.exceptions.RequestException: if any page fails after retries
+    """
+
+    headers = {}
+    if snapshot and snapshot.get("url") == url:
+        if snapshot.get("etag"):
+            headers["If-None-Match"] = snapshot["etag"]
+        if snapshot.get("last_modified"):
+            headers["If-Modified-Since"] = snapshot["last_modified"]
+    else:
+        snapshot = None
+
+    session = get_session()
+    response = fetch_catalog_page(url, 0, page_size, timeout, headers, session)
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+
+    if response.status_code == 304 and snapshot is not None:
+        products = snapshot["products"]
+        # A 304 need not repeat the validators (RFC 7232 4.1); keep the
+        # snapshot's so the next refresh is still conditional
+        etag = etag or snapshot.get("etag")
+        last_modified = last_modified or snapshot.get("last_modified")
+    else:
+        first_page = response.json()
+        products = first_page.get("products", [])
+        total = first_page.get("total", len(products))
+
+        def fetch_products(skip):
+            page = fetch_catalog_page(url, skip, page_size, timeout, session=session)
+            return page.json().get("products", [])
+
+        # Step by the page length actually served, in case the API caps limit
+        skips = range(len(products), total, len(products)) if products else ()
+        if skips:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                for page_products in executor.map(fetch_products, skips):
+                    products.extend(page_products)
+
+    if cache_file:
+        try:
+            save_catalog_snapshot({
+                "url": url,
+                "fetched_at": time.time(),
+                "etag": etag,
+                "last_modified": last_modified,
+                "products": products
+            }, cache_file)
+        except OSError as e:
+            print(f"Warning: could not save catalog cache: {e}")
+
+    return products
+
+
+def _revalidate_in_background(url, snapshot, cache_file, timeout, page_size, concurrency):
+    # Refresh errors are ignored; the stale snapshot is kept for the next run
+    try:
+        refresh_catalog(url, snapshot, cache_file, timeout, page_size, concurrency)
+    except (requests.exceptions.RequestException, ValueError):
+        pass
+
+
+def fetch_all_products(url=CATALOG_URL, cache_file=CATALOG_CACHE_FILE,
+                       ttl=CATALOG_TTL, max_stale=CATALOG_MAX_STALE, timeout=10,
+                       page_size=CATALOG_PAGE_SIZE, concurrency=CATALOG_CONCURRENCY):
     """
     Fetches all products from DummyJSON API
 
+    A local JSON snapshot is used as a cache:
+        - younger than ttl: returned without any network request
+        - up to max_stale past ttl: returned immediately while a background
+          thread revalidates it (stale-while-revalidate)
+        - older, or missing: fetched synchronously; if the request fails
+          the last good snapshot is returned instead of an empty list
+
+    Args:
+        url (str): catalog endpoint
+        cache_file (str): snapshot path, or None to disable caching
+        ttl (float): seconds a snapshot is considered fresh
+        max_stale (float): extra seconds a stale snapshot may be served
+        timeout (float): per-page request timeout in seconds
+        page_size (int): products requested per page
+        concurrency (int): pages fetched in parallel
+
     Returns:
         list of product dictionaries
     """
 
-    url = "https://dummyjson.com/products?limit=100"
+    snapshot = load_catalog_snapshot(cache_file) if cache_file else None
+    if snapshot and snapshot.get("url") != url:
+        snapshot = None
 
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+    if snapshot:
+        age = time.time() - snapshot.get("fetched_at", 0)
+
+        if age < ttl:
+            print(f"Loaded {len(snapshot['products'])} products from catalog cache")
+            return snapshot["products"]
 
-        data = response.json()
-        products = data.get("products", [])
+        if age < ttl + max_stale:
+            threading.Thread(
+                target=_revalidate_in_background,
+                args=(url, snapshot, cache_file, timeout, page_size, concurrency)
+            ).start()
+            print(f"Loaded {len(snapshot['products'])} products from stale catalog cache (refreshing)")
+            return snapshot["products"]
+
+    try:
+        products = refresh_catalog(url, snapshot, cache_file, timeout, page_size, concurrency)
 
         print(f"Successfully fetched {len(products)} products from API")
 
         return products
 
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
         print("Failed to fetch products from API")
         print(f"Error: {e}")
+
+        if snapshot:
+            print(f"Using last good catalog snapshot ({len(snapshot['products'])} products)")
+            return snapshot["products"]
+
         return []
 
 # b) Create Product Mapping
@@ -60,119 +290,186 @@ def create_product_mapping(api_products):
 
 # Task 3.2: Enrich Sales Data
 
-def enrich_sales_data(transactions, product_mapping):
+def build_enrichment_index(product_mapping):
     """
-    Enriches transaction data with API product information
+    Pre-builds the enrichment side-table for a product catalog.
+
+    Parameters:
+        product_mapping (dict): mapping from create_product_mapping()
+
+    Returns:
+        dict: numeric product ID -> API_* values, one shared dict per product
     """
 
-    enriched_transactions = []
+    return {
+        product_id: {
+            "API_Category": product_info.get("category"),
+            "API_Brand": product_info.get("brand"),
+            "API_Rating": product_info.get("rating"),
+            "API_Match": True
+        }
+        for product_id, product_info in product_mapping.items()
+    }
 
-    for tx in transactions:
-        enriched_tx = tx.copy()
 
-        try:
-            # Extract numeric product ID (P101 -> 101)
-            product_id_str = tx.get("ProductID", "")
-            numeric_id = int(product_id_str.replace("P", ""))
+def decode_product_id(product_id):
+    """
+    Extracts the numeric product ID (P101 -> 101), or None if malformed.
+    """
 
-            if numeric_id in product_mapping:
-                product_info = product_mapping[numeric_id]
+    try:
+        return int(product_id.replace("P", ""))
+    except (AttributeError, ValueError):
+        return None
 
-                enriched_tx["API_Category"] = product_info.get("category")
-                enriched_tx["API_Brand"] = product_info.get("brand")
-                enriched_tx["API_Rating"] = product_info.get("rating")
-                enriched_tx["API_Match"] = True
-            else:
-                enriched_tx["API_Category"] = None
-                enriched_tx["API_Brand"] = None
-                enriched_tx["API_Rating"] = None
-                enriched_tx["API_Match"] = False
 
-        except Exception:
-            enriched_tx["API_Category"] = None
-            enriched_tx["API_Brand"] = None
-            enriched_tx["API_Rating"] = None
-            enriched_tx["API_Match"] = False
+def enrich_sales_data(transactions, product_mapping):
+    """
+    Enriches transaction data with API product information
+
+    Works as a dimension join: each distinct ProductID is decoded and
+    looked up in the catalog index once, after which every row costs a
+    single dict lookup and gets a reference to the shared API_* values.
+    """
 
-        enriched_transactions.append(enriched_tx)
+    enriched_transactions = []
 
-    # -------- Save to file --------
-    output_file = "data/enriched_sales_data.txt"
+    # Side-table of enrichment values shared by every row of a product
+    no_match = {
+        "API_Category": None,
+        "API_Brand": None,
+        "API_Rating": None,
+        "API_Match": False
+    }
+    catalog_index = build_enrichment_index(product_mapping)
 
-    try:
-        with open(output_file, "w", encoding="utf-8") as f:
-            header = [
-                "TransactionID", "Date", "ProductID", "ProductName",
-                "Quantity", "UnitPrice", "CustomerID", "Region",
-                "API_Category", "API_Brand", "API_Rating", "API_Match"
-            ]
-            f.write("|".join(header) + "\n")
-
-            for tx in enriched_transactions:
-                row = [
-                    str(tx.get("TransactionID")),
-                    str(tx.get("Date")),
-                    str(tx.get("ProductID")),
-                    str(tx.get("ProductName")),
-                    str(tx.get("Quantity")),
-                    str(tx.get("UnitPrice")),
-                    str(tx.get("CustomerID")),
-                    str(tx.get("Region")),
-                    str(tx.get("API_Category")),
-                    str(tx.get("API_Brand")),
-                    str(tx.get("API_Rating")),
-                    str(tx.get("API_Match"))
-                ]
-                f.write("|".join(row) + "\n")
-
-        print(f"Enriched data saved to: {output_file}")
+    # ProductID string -> enrichment, filled once per distinct value
+    joined = {}
+    append = enriched_transactions.append
 
-    except Exception as e:
-        print("Failed to save enriched data")
-        print(e)
+    for tx in transactions:
+        product_id = tx.get("ProductID", "")
+
+        try:
+            enrichment = joined[product_id]
+        except KeyError:
+            numeric_id = decode_product_id(product_id)
+            enrichment = joined[product_id] = catalog_index.get(numeric_id, no_match)
+        except TypeError:
+            # Unhashable ProductID; cannot be decoded either
+            enrichment = no_match
+
+        append(EnrichedTransaction(tx, enrichment))
 
     return enriched_transactions
 
 #============================================
-def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt"):
+def _compression_for(filename, compression):
+    # None picks the codec from the file extension
+    if compression is None:
+        if filename.endswith(".gz"):
+            return "gzip"
+        if filename.endswith(".zst"):
+            return "zstd"
+        return "none"
+    if compression not in ("none", "gzip", "zstd"):
+        raise ValueError(f"Unsupported compression: {compression}")
+    return compression
+
+
+def _api_columns(row):
+    # Trailing API_* columns; missing values are written as empty fields
+    columns = [
+        "" if row.get(field) is None else str(row.get(field))
+        for field in ENRICHMENT_FIELDS[:-1]
+    ]
+    columns.append(str(row.get("API_Match", "")))
+    return "|".join(columns) + "\n"
+
+
+def _format_row(tx, suffixes):
+    if isinstance(tx, EnrichedTransaction):
+        base = tx.transaction
+        # Shared side-table entries are formatted once, not once per row;
+        # the entry is kept alongside so its id() cannot be reused
+        cached = suffixes.get(id(tx.enrichment))
+        if cached is None:
+            cached = suffixes[id(tx.enrichment)] = (tx.enrichment, _api_columns(tx.enrichment))
+        suffix = cached[1]
+    else:
+        base = tx
+        suffix = _api_columns(tx)
+
+    if type(base) is Transaction:
+        return (
+            f"{base.TransactionID}|{base.Date}|{base.ProductID}|{base.ProductName}|"
+            f"{base.Quantity}|{base.UnitPrice}|{base.CustomerID}|{base.Region}|{suffix}"
+        )
+    return "|".join(str(base.get(field, "")) for field in FIELDS) + "|" + suffix
+
+
+def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt",
+                       compression=None):
     """
     Saves enriched transactions back to file using pipe-delimited format
+
+    Rows are formatted into large batches and written through a temp file
+    that is renamed into place, so readers never see a partial file.
+
+    Parameters:
+        enriched_transactions (iterable): rows from enrich_sales_data()
+        filename (str): output path
+        compression (str): "none", "gzip" or "zstd"; by default taken from
+                           the extension (.gz / .zst)
+
+    Returns:
+        int: bytes written to disk, or None if saving failed
     """
 
-    header = [
-        "TransactionID", "Date", "ProductID", "ProductName",
-        "Quantity", "UnitPrice", "CustomerID", "Region",
-        "API_Category", "API_Brand", "API_Rating", "API_Match"
-    ]
+    header = FIELDS + ENRICHMENT_FIELDS
+    temp_file = f"{filename}.{os.getpid()}.tmp"
 
     try:
-        with open(filename, "w", encoding="utf-8") as file:
-            # Write header
-            file.write("|".join(header) + "\n")
-
-            # Write each enriched transaction
-            for tx in enriched_transactions:
-                row = [
-                    str(tx.get("TransactionID", "")),
-                    str(tx.get("Date", "")),
-                    str(tx.get("ProductID", "")),
-                    str(tx.get("ProductName", "")),
-                    str(tx.get("Quantity", "")),
-                    str(tx.get("UnitPrice", "")),
-                    str(tx.get("CustomerID", "")),
-                    str(tx.get("Region", "")),
-                    str(tx.get("API_Category", "")) if tx.get("API_Category") is not None else "",
-                    str(tx.get("API_Brand", "")) if tx.get("API_Brand") is not None else "",
-                    str(tx.get("API_Rating", "")) if tx.get("API_Rating") is not None else "",
-                    str(tx.get("API_Match", ""))
-                ]
-
-                file.write("|".join(row) + "\n")
+        compression = _compression_for(filename, compression)
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd output requires the zstandard package")
+
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(temp_file, "wb") as raw:
+            if compression == "gzip":
+                file = gzip.GzipFile(fileobj=raw, mode="wb", mtime=0)
+            elif compression == "zstd":
+                file = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+            else:
+                file = raw
 
+            try:
+                suffixes = {}
+                batch = ["|".join(header) + "\n"]
+
+                for tx in enriched_transactions:
+                    batch.append(_format_row(tx, suffixes))
+                    if len(batch) >= WRITE_BUFFER_ROWS:
+                        file.write("".join(batch).encode("utf-8"))
+                        batch.clear()
+
+                file.write("".join(batch).encode("utf-8"))
+            finally:
+                if file is not raw:
+                    file.close()
+
+            bytes_written = raw.tell()
+
+        os.replace(temp_file, filename)
         print(f"Enriched sales data saved successfully to: {filename}")
+        return bytes_written
 
     except Exception as e:
         print("Error while saving enriched sales data")
         print(e)
-
-
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        return None
@@ -0,0 +1,102 @@
+# utils/async_pipeline.py
+
+# Background Stages for the Async Pipeline
+
+import asyncio
+import io
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class _ThreadRoutedOutput(io.TextIOBase):
+    # sys.stdout stand-in: threads that registered a buffer write into it,
+    # every other thread writes straight through to the real stream
+
+    def __init__(self, target):
+        self.target = target
+        self._local = threading.local()
+
+    def capture(self):
+        self._local.buffer = []
+        return self._local.buffer
+
+    def release(self):
+        self._local.buffer = None
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            return self.target.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def flush(self):
+        self.target.flush()
+
+
+@contextmanager
+def routed_stdout():
+    """
+    Lets background stages buffer their console output.
+
+    Output printed by a stage running in a worker thread is held back and
+    replayed when the pipeline reaches that stage, so the log reads in
+    the same order as a sequential run.
+    """
+
+    original = sys.stdout
+    router = _ThreadRoutedOutput(original)
+    sys.stdout = router
+    try:
+        yield router
+    finally:
+        sys.stdout = original
+
+
+class BackgroundStage:
+    """
+    A pipeline stage started early in a worker thread.
+
+    start() submits func to the event loop's default executor right away
+    (not on the next loop iteration, so it overlaps even with stages that
+    never yield to the loop); join() awaits it, replays its buffered
+    output and returns the result. Wall and CPU time of the stage itself
+    are kept so they can be reported like any other stage.
+    """
+
+    def __init__(self, name, func, *args, **kwargs):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.output = ""
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self._future = None
+
+    def _run(self, router):
+        buffer = router.capture() if router is not None else None
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            return self.func(*self.args, **self.kwargs)
+        finally:
+            self.wall_seconds = round(time.perf_counter() - wall_start, 6)
+            self.cpu_seconds = round(time.thread_time() - cpu_start, 6)
+            if router is not None:
+                router.release()
+                self.output = "".join(buffer)
+
+    def start(self, router=None):
+        loop = asyncio.get_running_loop()
+        self._future = loop.run_in_executor(None, self._run, router)
+        return self
+
+    async def join(self):
+        try:
+            return await self._future
+        finally:
+            if self.output:
+                sys.stdout.write(self.output)
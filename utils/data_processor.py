@@ -1,210 +1,396 @@
+# Shared Aggregation Engine
+
+from utils.memo import memoize
+from utils.ranking import top_k
+from utils.sketches import HyperLogLog, KLLSketch, hash64
+
+# Per-customer distinct products are few, so a much smaller sketch suffices
+CUSTOMER_PRODUCTS_PRECISION = 6
+
+# Rollup values combined by union / merge rather than addition
+MERGEABLE = (set, HyperLogLog, KLLSketch)
+
+
+def new_aggregates(approximate=False):
+    """
+    Creates an empty aggregate state.
+
+    Args:
+        approximate (bool): keep HyperLogLog / KLL sketches instead of
+                            exact sets (see aggregate_transactions)
+
+    Returns:
+        dict: empty region / product / customer / daily rollups
+    """
+
+    return {
+        "approximate": approximate,
+        "transaction_count": 0,
+        "total_revenue": 0.0,
+        "regions": {},
+        "products": {},
+        "customers": {},
+        "daily": {}
+    }
+
+
+def aggregate_transactions(transactions, aggregates=None):
+    """
+    Builds every region, product, customer and date rollup in a single pass.
+
+    In approximate mode (new_aggregates(approximate=True)) the distinct
+    customers per day and per region and the distinct products per
+    customer are HyperLogLog sketches instead of sets, and each region
+    also keeps a KLL sketch of order values for quantiles. Memory then
+    stays fixed per key however many distinct values occur. Sketches
+    merge across chunks and runs like the exact sets do.
+
+    Args:
+        transactions (iterable): validated transaction dictionaries
+        aggregates (dict): existing state to update in place (optional)
+
+    Returns:
+        dict: aggregate state consumed by the analysis functions below
+    """
+
+    if aggregates is None:
+        aggregates = new_aggregates()
+
+    if aggregates.get("approximate"):
+        return _aggregate_approximate(transactions, aggregates)
+
+    regions = aggregates["regions"]
+    products = aggregates["products"]
+    customers = aggregates["customers"]
+    daily = aggregates["daily"]
+
+    count = 0
+    total_revenue = aggregates["total_revenue"]
+
+    for tx in transactions:
+        quantity = tx["Quantity"]
+        amount = quantity * tx["UnitPrice"]
+        product = tx["ProductName"]
+        customer_id = tx["CustomerID"]
+        region = tx["Region"]
+        date = tx["Date"]
+        count += 1
+        total_revenue += amount
+
+        stats = regions.get(region)
+        if stats is None:
+            stats = regions[region] = {"revenue": 0.0, "count": 0}
+        stats["revenue"] += amount
+        stats["count"] += 1
+
+        stats = products.get(product)
+        if stats is None:
+            stats = products[product] = {"quantity": 0, "revenue": 0.0}
+        stats["quantity"] += quantity
+        stats["revenue"] += amount
+
+        stats = customers.get(customer_id)
+        if stats is None:
+            stats = customers[customer_id] = {"spent": 0.0, "count": 0, "products": set()}
+        stats["spent"] += amount
+        stats["count"] += 1
+        stats["products"].add(product)
+
+        stats = daily.get(date)
+        if stats is None:
+            stats = daily[date] = {"revenue": 0.0, "count": 0, "customers": set()}
+        stats["revenue"] += amount
+        stats["count"] += 1
+        stats["customers"].add(customer_id)
+
+    aggregates["transaction_count"] += count
+    aggregates["total_revenue"] = total_revenue
+
+    return aggregates
+
+
+def _aggregate_approximate(transactions, aggregates):
+    regions = aggregates["regions"]
+    products = aggregates["products"]
+    customers = aggregates["customers"]
+    daily = aggregates["daily"]
+
+    count = 0
+    total_revenue = aggregates["total_revenue"]
+
+    # Each distinct CustomerID / ProductName is hashed once
+    hashes = {}
+
+    for tx in transactions:
+        quantity = tx["Quantity"]
+        amount = quantity * tx["UnitPrice"]
+        product = tx["ProductName"]
+        customer_id = tx["CustomerID"]
+        region = tx["Region"]
+        date = tx["Date"]
+        count += 1
+        total_revenue += amount
+
+        customer_hash = hashes.get(customer_id)
+        if customer_hash is None:
+            customer_hash = hashes[customer_id] = hash64(customer_id)
+        product_hash = hashes.get(product)
+        if product_hash is None:
+            product_hash = hashes[product] = hash64(product)
+
+        stats = regions.get(region)
+        if stats is None:
+            stats = regions[region] = {
+                "revenue": 0.0, "count": 0,
+                "customers": HyperLogLog(), "order_values": KLLSketch()
+            }
+        stats["revenue"] += amount
+        stats["count"] += 1
+        stats["customers"].add_hash(customer_hash)
+        stats["order_values"].add(amount)
+
+        stats = products.get(product)
+        if stats is None:
+            stats = products[product] = {"quantity": 0, "revenue": 0.0}
+        stats["quantity"] += quantity
+        stats["revenue"] += amount
+
+        stats = customers.get(customer_id)
+        if stats is None:
+            stats = customers[customer_id] = {
+                "spent": 0.0, "count": 0,
+                "products": HyperLogLog(CUSTOMER_PRODUCTS_PRECISION)
+            }
+        stats["spent"] += amount
+        stats["count"] += 1
+        stats["products"].add_hash(product_hash)
+
+        stats = daily.get(date)
+        if stats is None:
+            stats = daily[date] = {"revenue": 0.0, "count": 0, "customers": HyperLogLog()}
+        stats["revenue"] += amount
+        stats["count"] += 1
+        stats["customers"].add_hash(customer_hash)
+
+    aggregates["transaction_count"] += count
+    aggregates["total_revenue"] = total_revenue
+
+    return aggregates
+
+
+def merge_aggregates(target, source):
+    """
+    Merges one aggregate state into another.
+
+    Keys first seen in source are appended after the keys of target, so
+    merging partial states in input order keeps first-seen ordering.
+    Sets are unioned and sketches merged; both states must use the same
+    (exact or approximate) mode.
+
+    Args:
+        target (dict): aggregate state updated in place
+        source (dict): aggregate state to add
+
+    Returns:
+        dict: the updated target
+    """
+
+    if bool(target.get("approximate")) != bool(source.get("approximate")):
+        raise ValueError("cannot merge exact and approximate aggregates")
+
+    target["transaction_count"] += source["transaction_count"]
+    target["total_revenue"] += source["total_revenue"]
+
+    for name in ("regions", "products", "customers", "daily"):
+        rollup = target[name]
+
+        for key, stats in source[name].items():
+            current = rollup.get(key)
+            if current is None:
+                rollup[key] = {
+                    field: value.copy() if isinstance(value, MERGEABLE) else value
+                    for field, value in stats.items()
+                }
+                continue
+
+            for field, value in stats.items():
+                if isinstance(value, MERGEABLE):
+                    current[field] |= value
+                else:
+                    current[field] += value
+
+    return target
+
+
+def _get_aggregates(transactions, aggregates):
+    # Reuse a precomputed aggregate state when the caller already has one
+    if aggregates is None:
+        aggregates = aggregate_transactions(transactions)
+    return aggregates
+
 # Task 2.1: Sales Summary Calculator
 
 # a) Calculate Total Revenue
 
-def calculate_total_revenue(transactions):
+def calculate_total_revenue(transactions, aggregates=None):
     """
     Calculates total revenue from all transactions.
 
     Args:
         transactions (list): list of validated transaction dictionaries
+        aggregates (dict): precomputed aggregate_transactions() result (optional)
 
     Returns:
         float: total revenue
     """
 
-    total_revenue = 0.0
-
-    for tx in transactions:
-        total_revenue += tx["Quantity"] * tx["UnitPrice"]
+    aggregates = _get_aggregates(transactions, aggregates)
 
-    return round(total_revenue, 2)
+    return round(aggregates["total_revenue"], 2)
 
 # b) Region wise Sales Analysis
 
-def region_wise_sales(transactions):
+@memoize
+def region_wise_sales(transactions, aggregates=None, n=None):
     """
     Analyzes sales by region.
 
     Args:
         transactions (list): list of validated transaction dictionaries
+        aggregates (dict): precomputed aggregate_transactions() result (optional)
+        n (int): only return the top n regions (optional, default all)
 
     Returns:
         dict: region-wise sales statistics
     """
 
-    region_data = {}
-    total_revenue = calculate_total_revenue(transactions)
-
-    # Aggregate sales and counts per region
-    for tx in transactions:
-        region = tx["Region"]
-        revenue = tx["Quantity"] * tx["UnitPrice"]
-
-        if region not in region_data:
-            region_data[region] = {
-                "total_sales": 0.0,
-                "transaction_count": 0
-            }
+    aggregates = _get_aggregates(transactions, aggregates)
+    total_revenue = calculate_total_revenue(transactions, aggregates)
 
-        region_data[region]["total_sales"] += revenue
-        region_data[region]["transaction_count"] += 1
+    # Rank by total_sales descending
+    ranked = top_k(
+        aggregates["regions"].items(),
+        n,
+        key=lambda item: round(item[1]["revenue"], 2)
+    )
 
     # Calculate percentage and round values
-    for region in region_data:
-        percentage = (region_data[region]["total_sales"] / total_revenue) * 100
-        region_data[region]["percentage"] = round(percentage, 2)
-        region_data[region]["total_sales"] = round(region_data[region]["total_sales"], 2)
-
-    # Sort by total_sales descending
-    sorted_region_data = dict(
-        sorted(
-            region_data.items(),
-            key=lambda item: item[1]["total_sales"],
-            reverse=True
-        )
-    )
+    sorted_region_data = {}
+    for region, stats in ranked:
+        percentage = (stats["revenue"] / total_revenue) * 100
+        sorted_region_data[region] = {
+            "total_sales": round(stats["revenue"], 2),
+            "transaction_count": stats["count"],
+            "percentage": round(percentage, 2)
+        }
 
     return sorted_region_data
 
 # c) Top Selling Products
 
-def top_selling_products(transactions, n=5):
+@memoize
+def top_selling_products(transactions, n=5, aggregates=None):
     """
     Finds top n products by total quantity sold.
 
     Args:
         transactions (list): list of validated transaction dictionaries
-        n (int): number of top products to return
+        n (int): number of top products to return, or None for all
+        aggregates (dict): precomputed aggregate_transactions() result (optional)
 
     Returns:
         list: list of tuples (ProductName, TotalQuantity, TotalRevenue)
     """
 
-    product_summary = {}
+    aggregates = _get_aggregates(transactions, aggregates)
 
-    # Aggregate quantity and revenue per product
-    for tx in transactions:
-        product = tx["ProductName"]
-        quantity = tx["Quantity"]
-        revenue = quantity * tx["UnitPrice"]
-
-        if product not in product_summary:
-            product_summary[product] = {
-                "total_quantity": 0,
-                "total_revenue": 0.0
-            }
-
-        product_summary[product]["total_quantity"] += quantity
-        product_summary[product]["total_revenue"] += revenue
-
-    # Sort by total_quantity descending
-    sorted_products = sorted(
-        product_summary.items(),
-        key=lambda item: item[1]["total_quantity"],
-        reverse=True
+    # Bounded heap over total_quantity; n=None ranks every product
+    ranked_products = top_k(
+        aggregates["products"].items(),
+        n,
+        key=lambda item: item[1]["quantity"]
     )
 
     # Prepare output format
     top_products = []
-    for product, stats in sorted_products[:n]:
+    for product, stats in ranked_products:
         top_products.append(
-            (product, stats["total_quantity"], round(stats["total_revenue"], 2))
+            (product, stats["quantity"], round(stats["revenue"], 2))
         )
 
     return top_products
 
 # d) Customer Purchase Analysis
 
-def customer_analysis(transactions):
+@memoize
+def customer_analysis(transactions, aggregates=None, n=None):
     """
     Analyzes customer purchase patterns
 
+    Pass n to get only the top n customers; they are selected with a
+    bounded heap and only their statistics are built. With approximate
+    aggregates the product names are not kept, so each customer has an
+    estimated "distinct_products" count instead of "products_bought".
+
     Returns:
         dict: customer-wise statistics sorted by total_spent descending
     """
 
-    customer_data = {}
+    aggregates = _get_aggregates(transactions, aggregates)
 
-    # Step 1: Aggregate data per customer
-    for tx in transactions:
-        customer_id = tx["CustomerID"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
-        product = tx["ProductName"]
-
-        if customer_id not in customer_data:
-            customer_data[customer_id] = {
-                "total_spent": 0.0,
-                "purchase_count": 0,
-                "products_bought": set()   # use set for uniqueness
-            }
-
-        customer_data[customer_id]["total_spent"] += amount
-        customer_data[customer_id]["purchase_count"] += 1
-        customer_data[customer_id]["products_bought"].add(product)
-
-    # Step 2: Calculate average order value & convert set → list
-    for customer_id, stats in customer_data.items():
-        stats["avg_order_value"] = round(
-            stats["total_spent"] / stats["purchase_count"], 2
-        )
-        stats["products_bought"] = list(stats["products_bought"])
-
-    # Step 3: Sort by total_spent descending
-    sorted_customers = dict(
-        sorted(
-            customer_data.items(),
-            key=lambda item: item[1]["total_spent"],
-            reverse=True
-        )
+    # Rank by total_spent descending
+    ranked = top_k(
+        aggregates["customers"].items(),
+        n,
+        key=lambda item: item[1]["spent"]
     )
 
+    # Calculate average order value & convert set → list
+    sorted_customers = {}
+    for customer_id, stats in ranked:
+        record = {"total_spent": stats["spent"], "purchase_count": stats["count"]}
+        if isinstance(stats["products"], HyperLogLog):
+            record["distinct_products"] = len(stats["products"])
+        else:
+            record["products_bought"] = list(stats["products"])
+        record["avg_order_value"] = round(stats["spent"] / stats["count"], 2)
+        sorted_customers[customer_id] = record
+
     return sorted_customers
 
 # Task 2.2: Date-based Analysis
 
 # a) Daily Sales Trend
 
-def daily_sales_trend(transactions):
+@memoize
+def daily_sales_trend(transactions, aggregates=None):
     """
     Analyzes sales trends by date
 
+    unique_customers is an estimate when the aggregates are approximate;
+    see approximation_error_bounds().
+
     Returns:
         dict: date-wise sales statistics sorted chronologically
     """
 
-    daily_data = {}
+    aggregates = _get_aggregates(transactions, aggregates)
 
-    # Step 1: Aggregate data by date
-    for tx in transactions:
-        date = tx["Date"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
-        customer_id = tx["CustomerID"]
-
-        if date not in daily_data:
-            daily_data[date] = {
-                "revenue": 0.0,
-                "transaction_count": 0,
-                "unique_customers": set()
-            }
-
-        daily_data[date]["revenue"] += amount
-        daily_data[date]["transaction_count"] += 1
-        daily_data[date]["unique_customers"].add(customer_id)
-
-    # Step 2: Convert set → count & clean structure
-    for date, stats in daily_data.items():
-        stats["unique_customers"] = len(stats["unique_customers"])
-        stats["revenue"] = round(stats["revenue"], 2)
-
-    # Step 3: Sort chronologically by date
-    sorted_daily_data = dict(sorted(daily_data.items()))
+    # Convert set → count & sort chronologically by date
+    sorted_daily_data = {}
+    for date, stats in sorted(aggregates["daily"].items()):
+        sorted_daily_data[date] = {
+            "revenue": round(stats["revenue"], 2),
+            "transaction_count": stats["count"],
+            "unique_customers": len(stats["customers"])
+        }
 
     return sorted_daily_data
 
 # b) Find Peak Sales Day
 
-def find_peak_sales_day(transactions):
+@memoize
+def find_peak_sales_day(transactions, aggregates=None):
     """
     Identifies the date with highest revenue
 
@@ -212,40 +398,92 @@ def find_peak_sales_day(transactions):
         tuple: (date, revenue, transaction_count)
     """
 
-    daily_summary = {}
+    aggregates = _get_aggregates(transactions, aggregates)
 
-    # Step 1: Aggregate revenue & transaction count per date
-    for tx in transactions:
-        date = tx["Date"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
-
-        if date not in daily_summary:
-            daily_summary[date] = {
-                "revenue": 0.0,
-                "transaction_count": 0
-            }
-
-        daily_summary[date]["revenue"] += amount
-        daily_summary[date]["transaction_count"] += 1
-
-    # Step 2: Find peak revenue day
     peak_date = None
     peak_revenue = 0.0
     peak_count = 0
 
-    for date, stats in daily_summary.items():
+    for date, stats in aggregates["daily"].items():
         if stats["revenue"] > peak_revenue:
             peak_date = date
             peak_revenue = stats["revenue"]
-            peak_count = stats["transaction_count"]
+            peak_count = stats["count"]
 
     return (peak_date, round(peak_revenue, 2), peak_count)
 
+# c) Region Customer Distribution (approximate mode)
+
+def region_customer_stats(transactions, aggregates=None, quantiles=(0.5, 0.95, 0.99)):
+    """
+    Estimates distinct customers and order-value quantiles per region.
+
+    Needs approximate aggregates; if none are given they are built.
+
+    Args:
+        transactions (list): list of validated transaction dictionaries
+        aggregates (dict): aggregate_transactions() result in approximate mode
+        quantiles (tuple): order-value quantiles to report
+
+    Returns:
+        dict: region -> {"unique_customers", "unique_customers_error",
+              "p50", "p95", ..., "rank_error"}; the errors are the
+              relative standard error of the distinct count and the
+              normalized rank error of the quantiles
+    """
+
+    if aggregates is None:
+        aggregates = aggregate_transactions(transactions, new_aggregates(approximate=True))
+    elif not aggregates.get("approximate"):
+        raise ValueError("region_customer_stats requires approximate aggregates")
+
+    region_data = {}
+    for region, stats in aggregates["regions"].items():
+        customers = stats["customers"]
+        order_values = stats["order_values"]
+
+        record = {
+            "unique_customers": len(customers),
+            "unique_customers_error": round(customers.relative_error, 4)
+        }
+        for q in quantiles:
+            value = order_values.quantile(q)
+            record[f"p{q * 100:g}"] = round(value, 2) if value is not None else None
+        record["rank_error"] = round(order_values.rank_error, 4)
+
+        region_data[region] = record
+
+    return region_data
+
+
+def approximation_error_bounds(aggregates):
+    """
+    Reports the error bounds of the sketches in an aggregate state.
+
+    Returns:
+        dict: relative standard error of each distinct count and the
+              normalized rank error of the quantiles, or None for exact
+              aggregates
+    """
+
+    if not aggregates.get("approximate"):
+        return None
+
+    return {
+        "daily_unique_customers": round(HyperLogLog().relative_error, 4),
+        "region_unique_customers": round(HyperLogLog().relative_error, 4),
+        "customer_distinct_products": round(
+            HyperLogLog(CUSTOMER_PRODUCTS_PRECISION).relative_error, 4
+        ),
+        "region_order_value_rank": round(KLLSketch().rank_error, 4)
+    }
+
 # Task 2.3: Product Performance
 
 # a) Low Performing Products
 
-def low_performing_products(transactions, threshold=10):
+@memoize
+def low_performing_products(transactions, threshold=10, aggregates=None):
     """
     Identifies products with low sales
 
@@ -253,32 +491,17 @@ def low_performing_products(transactions, threshold=10):
         list of tuples: (ProductName, TotalQuantity, TotalRevenue)
     """
 
-    product_summary = {}
-
-    # Step 1: Aggregate quantity and revenue per product
-    for tx in transactions:
-        product = tx["ProductName"]
-        quantity = tx["Quantity"]
-        revenue = tx["Quantity"] * tx["UnitPrice"]
-
-        if product not in product_summary:
-            product_summary[product] = {
-                "total_quantity": 0,
-                "total_revenue": 0.0
-            }
-
-        product_summary[product]["total_quantity"] += quantity
-        product_summary[product]["total_revenue"] += revenue
+    aggregates = _get_aggregates(transactions, aggregates)
 
-    # Step 2: Filter low performing products
+    # Filter low performing products
     low_products = []
-    for product, stats in product_summary.items():
-        if stats["total_quantity"] < threshold:
+    for product, stats in aggregates["products"].items():
+        if stats["quantity"] < threshold:
             low_products.append(
-                (product, stats["total_quantity"], round(stats["total_revenue"], 2))
+                (product, stats["quantity"], round(stats["revenue"], 2))
             )
 
-    # Step 3: Sort by total quantity ascending
+    # Sort by total quantity ascending
     low_products.sort(key=lambda x: x[1])
 
     return low_products
@@ -0,0 +1,357 @@
+# utils/dataset.py
+
+# Multi-file / Partitioned Sales Datasets
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+from utils.file_handler import (
+    read_sales_data,
+    parse_transactions,
+    iter_sales_data,
+    iter_transactions,
+    iter_valid_transactions,
+    stream_transactions,
+    validate_and_filter,
+    merge_validation_summary,
+    new_validation_summary
+)
+from utils.data_processor import aggregate_transactions, merge_aggregates, new_aggregates
+from utils.transaction import FIELDS
+
+# Header line every sales file starts with
+SALES_HEADER = "|".join(FIELDS)
+
+
+def partition_values(path, root):
+    """
+    Parses Hive-style key=value directories between root and a file.
+
+    "root/region=North/date=2024-12-01/sales.txt" gives
+    {"region": "North", "date": "2024-12-01"}. Keys are lower-cased and
+    values URL-decoded; other directory names are ignored.
+
+    Returns:
+        dict: partition key -> value
+    """
+
+    values = {}
+    relative = os.path.relpath(os.path.dirname(path), root)
+    for part in relative.split(os.sep):
+        key, sep, value = part.partition("=")
+        if sep and key:
+            values[unquote(key).lower()] = unquote(value)
+    return values
+
+
+def _has_wildcard(text):
+    return any(char in text for char in "*?[")
+
+
+def _glob_root(pattern):
+    # Directory part of a glob before its first wildcard
+    parts = []
+    for part in pattern.split(os.sep):
+        if _has_wildcard(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or "."
+
+
+def _walk_files(directory):
+    # Every file below directory, skipping hidden files and directories (e.g. .parsed_cache)
+    for current, dirs, names in os.walk(directory):
+        dirs[:] = [name for name in dirs if not name.startswith(".")]
+        for name in names:
+            if not name.startswith("."):
+                yield os.path.join(current, name)
+
+
+def is_sales_file(path):
+    """
+    Checks that a file starts with the sales header (SALES_HEADER).
+
+    Directories and globs also match other files, such as
+    enriched_sales_data.txt next to sales_data.txt, whose extra columns
+    would otherwise be read as sales rows. Only the first line is read.
+
+    Returns:
+        bool: True if the header matches exactly
+    """
+
+    try:
+        with open(path, "rb") as file:
+            header = file.readline(len(SALES_HEADER) + 8)
+    except OSError:
+        return False
+
+    # The header is ASCII in every supported encoding; a UTF-8 BOM may precede it
+    return header.removeprefix(b"\xef\xbb\xbf").strip() == SALES_HEADER.encode()
+
+
+def _in_date_range(date, start_date, end_date):
+    # ISO dates compare correctly as strings
+    return (start_date is None or date >= start_date) and (end_date is None or date <= end_date)
+
+
+def _date_filtered(transactions, start_date, end_date):
+    if start_date is None and end_date is None:
+        return transactions
+    return [tx for tx in transactions if _in_date_range(tx["Date"], start_date, end_date)]
+
+
+def _read_file(path, start_date=None, end_date=None):
+    # Reads and parses one file; returns (raw line count, transactions)
+    raw_lines = read_sales_data(path)
+    transactions = _date_filtered(parse_transactions(raw_lines), start_date, end_date)
+    return len(raw_lines), transactions
+
+
+def aggregate_file(path, region=None, min_amount=None, max_amount=None,
+                   start_date=None, end_date=None, approximate=False):
+    """
+    Reads, parses, validates and aggregates one file of a dataset.
+
+    Returns:
+        tuple: (partial aggregate state, partial validation summary)
+    """
+
+    transactions = iter_transactions(iter_sales_data(path))
+    if start_date is not None or end_date is not None:
+        transactions = (tx for tx in transactions if _in_date_range(tx["Date"], start_date, end_date))
+
+    summary = {}
+    valid = iter_valid_transactions(transactions, region, min_amount, max_amount, summary)
+    return aggregate_transactions(valid, new_aggregates(approximate)), summary
+
+
+def load_file(path, start_date=None, end_date=None, approximate=False):
+    """
+    Like aggregate_file, but also sends back the file's valid rows.
+
+    Returns:
+        tuple: (partial aggregate state, partial validation summary with
+               the number of raw "lines" read, list of valid Transaction
+               records)
+    """
+
+    counts = {}
+    transactions = stream_transactions(path, counts)
+    if start_date is not None or end_date is not None:
+        transactions = (tx for tx in transactions if _in_date_range(tx["Date"], start_date, end_date))
+
+    summary = {}
+    valid = list(iter_valid_transactions(transactions, summary=summary))
+    summary["lines"] = counts["lines"]
+    return aggregate_transactions(valid, new_aggregates(approximate)), summary, valid
+
+
+class PartitionedDataset:
+    """
+    A set of sales files read as one dataset.
+
+    The source can be a single file, a directory (searched recursively),
+    a glob pattern, or a Hive-style partitioned layout such as
+    data/sales/region=North/date=2024-12-01/sales.txt. Partition values
+    are taken from the directory names. A region or date range then
+    prunes whole files before anything is opened. Files without a
+    partition key for a filter are always read, and the filter is
+    applied to their rows instead. Directories and globs only pick up
+    files whose header matches SALES_HEADER; a single file is read as
+    given. Files are processed in sorted path order, so results do not
+    depend on how many workers ran.
+    """
+
+    def __init__(self, source):
+        self.source = source
+
+        if _has_wildcard(source):
+            root = _glob_root(source)
+            paths = [
+                path for path in glob.glob(source, recursive=True)
+                if os.path.isfile(path) and is_sales_file(path)
+            ]
+        elif os.path.isdir(source):
+            root = source
+            paths = [path for path in _walk_files(source) if is_sales_file(path)]
+        elif os.path.isfile(source):
+            root = os.path.dirname(source) or "."
+            paths = [source]
+        else:
+            raise FileNotFoundError(f"No sales data found at {source}")
+
+        self.root = root
+        self.files = [(path, partition_values(path, root)) for path in sorted(paths)]
+
+    def __len__(self):
+        return len(self.files)
+
+    def partitions(self):
+        """
+        Returns:
+            dict: partition key -> sorted distinct values
+        """
+
+        keys = {}
+        for _, values in self.files:
+            for key, value in values.items():
+                keys.setdefault(key, set()).add(value)
+        return {key: sorted(values) for key, values in keys.items()}
+
+    def select(self, region=None, start_date=None, end_date=None):
+        """
+        Prunes files by region / date partitions.
+
+        Args:
+            region (str): keep region=<region> partitions (optional)
+            start_date (str): earliest YYYY-MM-DD date partition (optional)
+            end_date (str): latest YYYY-MM-DD date partition (optional)
+
+        Returns:
+            tuple: (list of paths to read, number of files pruned)
+        """
+
+        selected = []
+        for path, values in self.files:
+            if region and "region" in values and values["region"] != region:
+                continue
+            if "date" in values and not _in_date_range(values["date"], start_date, end_date):
+                continue
+            selected.append(path)
+
+        return selected, len(self.files) - len(selected)
+
+    def read(self, region=None, start_date=None, end_date=None):
+        """
+        Reads and parses the selected files, one after another.
+
+        Parsing is CPU-bound, so reader threads would only take turns on
+        the GIL; load() and aggregate() parse in worker processes instead.
+        Rows outside the date range are dropped even in files without a
+        date partition. Region pruning only skips files; rows are left
+        for validate_and_filter.
+
+        Args:
+            region (str): region partition to read (optional)
+            start_date (str): first date to read (optional)
+            end_date (str): last date to read (optional)
+
+        Returns:
+            tuple: (transactions, read_info dict with files_read,
+                   files_pruned and lines)
+        """
+
+        paths, pruned = self.select(region, start_date, end_date)
+
+        transactions = []
+        lines = 0
+        for path in paths:
+            line_count, part = _read_file(path, start_date, end_date)
+            lines += line_count
+            transactions.extend(part)
+
+        read_info = {
+            "files_read": len(paths),
+            "files_pruned": pruned,
+            "lines": lines
+        }
+
+        return transactions, read_info
+
+    def validate_and_filter(self, region=None, min_amount=None, max_amount=None,
+                            start_date=None, end_date=None):
+        """
+        Reads only the partitions the filters can match, then validates.
+
+        Returns:
+            tuple: (valid_transactions, invalid_count, summary_dict); the
+                   summary also carries files_read and files_pruned
+        """
+
+        transactions, read_info = self.read(region, start_date, end_date)
+        filtered, invalid_count, summary = validate_and_filter(transactions, region, min_amount, max_amount)
+        summary["files_read"] = read_info["files_read"]
+        summary["files_pruned"] = read_info["files_pruned"]
+        return filtered, invalid_count, summary
+
+    def aggregate(self, region=None, min_amount=None, max_amount=None,
+                  start_date=None, end_date=None, workers=None, approximate=False):
+        """
+        Aggregates the selected files across several processes.
+
+        Each worker reads, validates and aggregates whole files and sends
+        back only its partial aggregate state. Partials are merged in file
+        order, as in parallel_aggregate.
+
+        Returns:
+            tuple: (aggregate state, validation summary with files_read
+                   and files_pruned)
+        """
+
+        paths, pruned = self.select(region, start_date, end_date)
+        args = [
+            (path, region, min_amount, max_amount, start_date, end_date, approximate)
+            for path in paths
+        ]
+
+        aggregates = new_aggregates(approximate)
+        summary = new_validation_summary()
+
+        def merge(partials):
+            # Merged as they arrive in file order, without collecting them first
+            for partial_aggregates, partial_summary in partials:
+                merge_aggregates(aggregates, partial_aggregates)
+                merge_validation_summary(summary, partial_summary)
+
+        if workers == 1 or len(paths) <= 1:
+            merge(aggregate_file(*arg) for arg in args)
+        else:
+            # Batch small files so each task is worth a round trip to a worker
+            chunksize = max(1, len(args) // (4 * (workers or os.cpu_count() or 1)))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                merge(executor.map(aggregate_file, *zip(*args), chunksize=chunksize))
+
+        summary["files_read"] = len(paths)
+        summary["files_pruned"] = pruned
+        return aggregates, summary
+
+    def load(self, region=None, start_date=None, end_date=None, workers=None, approximate=False):
+        """
+        Reads, validates and aggregates the selected files across
+        processes, keeping the valid rows.
+
+        Like aggregate(), plus the rows each worker validated,
+        concatenated in file order.
+        Region pruning only skips files, as in read().
+
+        Returns:
+            tuple: (aggregate state, validation summary with lines,
+                   files_read and files_pruned, list of valid Transaction
+                   records)
+        """
+
+        paths, pruned = self.select(region, start_date, end_date)
+        args = [(path, start_date, end_date, approximate) for path in paths]
+
+        aggregates = new_aggregates(approximate)
+        summary = new_validation_summary()
+        transactions = []
+
+        def merge(partials):
+            for partial_aggregates, partial_summary, rows in partials:
+                merge_aggregates(aggregates, partial_aggregates)
+                merge_validation_summary(summary, partial_summary)
+                transactions.extend(rows)
+
+        if workers == 1 or len(paths) <= 1:
+            merge(load_file(*arg) for arg in args)
+        else:
+            chunksize = max(1, len(args) // (4 * (workers or os.cpu_count() or 1)))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                merge(executor.map(load_file, *zip(*args), chunksize=chunksize))
+
+        summary["files_read"] = len(paths)
+        summary["files_pruned"] = pruned
+        return aggregates, summary, transactions
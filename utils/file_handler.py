@@ -1,5 +1,133 @@
 # utils/file_handler.py
 
+import codecs
+import mmap
+import os
+from itertools import chain
+from sys import intern
+
+import numpy as np
+
+from utils.transaction import Transaction
+from utils.transaction_table import TransactionTable
+
+
+ENCODINGS = ['utf-8', 'latin-1', 'cp1252']
+
+# Bytes of a memory-mapped file copied and split per step by iter_transactions_mmap
+MMAP_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Bytes decoded per step when detect_encoding scans a file
+ENCODING_SCAN_BLOCK = 4 * 1024 * 1024
+
+
+def _decode_line(raw_line):
+    # Decode one line, falling back through the supported encodings
+    for encoding in ENCODINGS:
+        try:
+            return raw_line.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def iter_sales_data(filename, start=0, end=None, encoding=None):
+    """
+    Lazily reads sales data lines from file handling encoding issues.
+
+    The file is read one line at a time, so memory use does not grow
+    with the size of the input. Every line is decoded with the encoding
+    detect_encoding finds for the whole file (or range), so the result
+    matches decoding the file in one piece. A byte range can be given to
+    read only part of the file; it must be aligned to line boundaries.
+
+    Args:
+        filename (str): Path to sales_data.txt file
+        start (int): byte offset to start reading from (optional)
+        end (int): byte offset to stop reading at (optional)
+        encoding (str): skip detection, e.g. when reading several ranges
+                        of one file (optional)
+
+    Yields:
+        str: raw transaction lines (header and empty lines removed)
+    """
+
+    try:
+        file = open(filename, 'rb')
+    except FileNotFoundError:
+        print(f"Error: File not found -> {filename}")
+        return
+
+    with file:
+        if encoding is None:
+            encoding = detect_encoding(filename, start, end)
+        if encoding is None:
+            print("Error: Unable to read file with supported encodings.")
+            return
+
+        position = start
+
+        if start:
+            file.seek(start)
+        else:
+            # Skip header
+            header = next(file, b"")
+            if not header:
+                print("Error: Unable to read file with supported encodings.")
+                return
+            position += len(header)
+
+        for raw_line in file:
+            if end is not None and position >= end:
+                break
+            position += len(raw_line)
+
+            try:
+                line = raw_line.decode(encoding)
+            except UnicodeDecodeError:
+                # Only possible when the caller's encoding does not fit the range
+                line = _decode_line(raw_line)
+                if line is None:
+                    continue
+
+            line = line.strip()
+            if line:
+                yield line
+
+
+def split_file_ranges(filename, chunk_size=64 * 1024 * 1024):
+    """
+    Splits a file into newline-aligned byte ranges.
+
+    Args:
+        filename (str): Path to sales_data.txt file
+        chunk_size (int): approximate size of each range in bytes
+
+    Returns:
+        list: list of (start, end) byte offsets covering the whole file
+    """
+
+    ranges = []
+    size = os.path.getsize(filename)
+
+    with open(filename, 'rb') as file:
+        start = 0
+        while start < size:
+            end = start + chunk_size
+            if end >= size:
+                end = size
+            else:
+                # Move the boundary forward to the end of the current line
+                file.seek(end)
+                file.readline()
+                end = file.tell()
+
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
 def read_sales_data(filename):
     """
     Reads sales data from file handling encoding issues.
@@ -11,146 +139,576 @@ def read_sales_data(filename):
         list: List of raw transaction lines (strings)
     """
 
-    encodings = ['utf-8', 'latin-1', 'cp1252']
-    lines = []
+    return list(iter_sales_data(filename))
 
-    for encoding in encodings:
-        try:
-            with open(filename, 'r', encoding=encoding) as file:
-                lines = file.readlines()
-            # If reading is successful, break the loop
-            break
-        except UnicodeDecodeError:
-            # Try next encoding
-            continue
-        except FileNotFoundError:
-            print(f"Error: File not found -> {filename}")
-            return []
 
-    if not lines:
-        print("Error: Unable to read file with supported encodings.")
-        return []
+def parse_line(line):
+    """
+    Parses a single raw sales line into a transaction dictionary.
 
-    # Remove header and empty lines
-    cleaned_lines = []
-    for line in lines[1:]:  # Skip header
-        line = line.strip()
-        if line:
-            cleaned_lines.append(line)
+    Args:
+        line (str): raw transaction string
 
-    return cleaned_lines
+    Returns:
+        Transaction: parsed transaction, or None if the line is malformed
+    """
 
+    parts = line.split('|')
+
+    # Skip rows with incorrect number of fields
+    if len(parts) != 8:
+        return None
+
+    (
+        transaction_id,
+        date,
+        product_id,
+        product_name,
+        quantity,
+        unit_price,
+        customer_id,
+        region
+    ) = parts
+
+    # Clean ProductName (remove commas / take base name)
+    product_name = product_name.split(',')[0].strip()
+
+    # Clean numeric fields (remove commas)
+    quantity = quantity.replace(',', '').strip()
+    unit_price = unit_price.replace(',', '').strip()
+
+    try:
+        quantity = int(quantity)
+        unit_price = float(unit_price)
+    except ValueError:
+        # Skip records with invalid numeric conversion
+        return None
+
+    # Categorical fields repeat across rows; interning makes every row share
+    # one string per distinct value, as the mmap parser's decode cache does
+    return Transaction(
+        transaction_id.strip(),
+        intern(date.strip()),
+        intern(product_id.strip()),
+        intern(product_name),
+        quantity,
+        unit_price,
+        intern(customer_id.strip()),
+        intern(region.strip())
+    )
+
+
+def iter_transactions(raw_lines):
+    """
+    Lazily parses raw sales lines into cleaned transaction records.
+
+    Args:
+        raw_lines (iterable): raw transaction strings
+
+    Yields:
+        Transaction: parsed transaction records
+    """
+
+    for line in raw_lines:
+        transaction = parse_line(line)
+        if transaction is not None:
+            yield transaction
 
 
 def parse_transactions(raw_lines):
     """
-    Parses raw sales lines into a cleaned list of dictionaries.
+    Parses raw sales lines into a cleaned list of transaction records.
 
     Args:
         raw_lines (list): List of raw transaction strings
 
     Returns:
-        list: List of parsed transaction dictionaries
+        list: List of parsed Transaction records
     """
 
-    transactions = []
+    return list(iter_transactions(raw_lines))
 
+
+def _counted(raw_lines, counts):
     for line in raw_lines:
-        parts = line.split('|')
+        counts["lines"] += 1
+        yield line
 
-        # Skip rows with incorrect number of fields
-        if len(parts) != 8:
-            continue
 
-        (
-            transaction_id,
-            date,
-            product_id,
-            product_name,
-            quantity,
-            unit_price,
-            customer_id,
-            region
-        ) = parts
+def stream_transactions(filename, counts=None, start=0, end=None, encoding=None):
+    """
+    Streams parsed transactions straight from file without building lists.
+
+    Args:
+        filename (str): Path to sales_data.txt file
+        counts (dict): updated in place with the number of raw "lines"
+                       read, as read_sales_data would return (optional)
+        start (int): newline-aligned start offset (see iter_sales_data)
+        end (int): newline-aligned end offset (optional)
+        encoding (str): encoding of the whole file (optional)
+
+    Yields:
+        Transaction: parsed transaction records
+    """
+
+    raw_lines = iter_sales_data(filename, start, end, encoding)
+    if counts is not None:
+        counts["lines"] = 0
+        raw_lines = _counted(raw_lines, counts)
+    return iter_transactions(raw_lines)
+
+
+def detect_encoding(filename, start=0, end=None):
+    """
+    Finds the encoding of a file (or byte range) as a whole.
+
+    Returns the first of ENCODINGS that decodes every byte, exactly like
+    decoding the whole file at once and falling back on failure, so a
+    mostly UTF-8 file with one latin-1 byte is read as latin-1 throughout.
+    The bytes are scanned in blocks with incremental decoders, so the
+    file is never held in memory.
+
+    Args:
+        filename (str): Path to sales_data.txt file
+        start (int): byte offset to start at (optional)
+        end (int): byte offset to stop at (optional)
+
+    Returns:
+        str: encoding, or None if no supported encoding decodes the file
+    """
+
+    with open(filename, 'rb') as file:
+        for encoding in ENCODINGS:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            file.seek(start)
+            remaining = float("inf") if end is None else end - start
+            try:
+                while remaining > 0:
+                    block = file.read(int(min(ENCODING_SCAN_BLOCK, remaining)))
+                    if not block:
+                        break
+                    remaining -= len(block)
+                    decoder.decode(block)
+                decoder.decode(b"", final=True)
+                return encoding
+            except UnicodeDecodeError:
+                continue
+
+    return None
+
+
+def _mapped_line_blocks(mapped, start=0, end=None, block_size=MMAP_BLOCK_SIZE):
+    # Yields the complete lines of [start, end) a block at a time; a line
+    # cut by a block boundary is carried into the next block
+    end = len(mapped) if end is None else min(end, len(mapped))
+    position = start
+    tail = b""
+    while position < end:
+        block = mapped[position:min(position + block_size, end)]
+        position += len(block)
+        lines = block.split(b"\n")
+        if tail:
+            lines[0] = tail + lines[0]
+        tail = lines.pop()
+        yield lines
+    if tail:
+        yield [tail]
+
+
+def iter_transactions_mmap(filename, start=0, end=None, encoding=None):
+    """
+    Parses transactions from a memory-mapped file.
+
+    The mapping is copied and split into lines MMAP_BLOCK_SIZE bytes at a
+    time, so the raw text is never held whole and the file may be larger
+    than RAM. This is not zero-copy: every field is still sliced into its
+    own bytes object. Numeric fields are converted straight from bytes,
+    and text fields are decoded once per distinct value and then shared
+    between rows. Rows are cleaned exactly
+    like parse_transactions: thousands commas are removed from numbers
+    and product names are cut at the first comma.
+
+    Args:
+        filename (str): Path to sales_data.txt file
+        start (int): newline-aligned byte offset to start at (optional)
+        end (int): newline-aligned byte offset to stop at (optional)
+        encoding (str): file encoding (default: detect_encoding over the range)
 
-        # Clean ProductName (remove commas / take base name)
-        product_name = product_name.split(',')[0].strip()
+    Yields:
+        Transaction: parsed transaction records
+    """
+
+    try:
+        file = open(filename, 'rb')
+    except FileNotFoundError:
+        print(f"Error: File not found -> {filename}")
+        return
+
+    with file:
+        # Empty files cannot be memory-mapped
+        if not os.fstat(file.fileno()).st_size:
+            return
+
+        if encoding is None:
+            encoding = detect_encoding(filename, start, end) or ENCODINGS[-1]
+
+        decoded = {}
+        cached = decoded.get
+
+        def decode(raw):
+            # Decode a field once per distinct value; later rows hit the cache
+            try:
+                text = raw.decode(encoding)
+            except UnicodeDecodeError:
+                text = _decode_line(raw)
+            text = decoded[raw] = text.strip()
+            return text
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if not start:
+                # Skip header
+                start = mapped.find(b"\n") + 1 or len(mapped)
+
+            for line in chain.from_iterable(_mapped_line_blocks(mapped, start, end)):
+                parts = line.strip().split(b'|')
+
+                # Skip rows with incorrect number of fields
+                if len(parts) != 8:
+                    continue
+
+                transaction_id, date, product_id, product_name, quantity, unit_price, customer_id, region = parts
+
+                try:
+                    quantity = int(quantity.replace(b',', b'') if b',' in quantity else quantity)
+                    unit_price = float(unit_price.replace(b',', b'') if b',' in unit_price else unit_price)
+                except ValueError:
+                    # Skip records with invalid numeric conversion
+                    continue
+
+                # Clean ProductName (remove commas / take base name)
+                comma = product_name.find(b',')
+                if comma != -1:
+                    product_name = product_name[:comma]
+
+                # TransactionIDs are unique, so they bypass the cache
+                try:
+                    transaction_id = transaction_id.decode(encoding).strip()
+                except UnicodeDecodeError:
+                    transaction_id = _decode_line(transaction_id).strip()
+
+                yield Transaction(
+                    transaction_id,
+                    cached(date) or decode(date),
+                    cached(product_id) or decode(product_id),
+                    cached(product_name) or decode(product_name),
+                    quantity,
+                    unit_price,
+                    cached(customer_id) or decode(customer_id),
+                    cached(region) or decode(region)
+                )
+
+
+def is_valid_transaction(tx):
+    """
+    Checks a transaction against the validation rules.
 
-        # Clean numeric fields (remove commas)
-        quantity = quantity.replace(',', '').strip()
-        unit_price = unit_price.replace(',', '').strip()
+    Args:
+        tx (dict): transaction dictionary
 
+    Returns:
+        bool: True if the transaction passes every rule
+    """
+
+    try:
+        return not (
+            tx.get("Quantity") <= 0 or
+            tx.get("UnitPrice") <= 0 or
+            not tx.get("TransactionID", "").startswith("T") or
+            not tx.get("ProductID", "").startswith("P") or
+            not tx.get("CustomerID", "").startswith("C") or
+            not tx.get("Region")
+        )
+    except Exception:
+        return False
+
+
+# Validation rules in the order is_valid_transaction applies them; a
+# rejected row is counted under the first rule it fails
+VALIDATION_RULES = (
+    ("bad_quantity", lambda tx: not tx.get("Quantity") <= 0),
+    ("bad_unit_price", lambda tx: not tx.get("UnitPrice") <= 0),
+    ("bad_transaction_id", lambda tx: tx.get("TransactionID", "").startswith("T")),
+    ("bad_product_id", lambda tx: tx.get("ProductID", "").startswith("P")),
+    ("bad_customer_id", lambda tx: tx.get("CustomerID", "").startswith("C")),
+    ("missing_region", lambda tx: bool(tx.get("Region")))
+)
+
+
+def rejection_rule(tx):
+    """
+    Names the first validation rule a transaction fails.
+
+    Returns:
+        str: rule name from VALIDATION_RULES, or None if the transaction is valid
+    """
+
+    for name, check in VALIDATION_RULES:
         try:
-            quantity = int(quantity)
-            unit_price = float(unit_price)
-        except ValueError:
-            # Skip records with invalid numeric conversion
+            if not check(tx):
+                return name
+        except Exception:
+            return name
+    return None
+
+
+def new_rejection_counts():
+    return {name: 0 for name, _ in VALIDATION_RULES}
+
+
+def new_validation_summary():
+    """
+    Returns:
+        dict: zeroed validate_and_filter summary counters
+    """
+
+    return {
+        "total_input": 0,
+        "invalid": 0,
+        "filtered_by_region": 0,
+        "filtered_by_amount": 0,
+        "final_count": 0,
+        "rejected_by_rule": new_rejection_counts()
+    }
+
+
+def merge_validation_summary(target, source):
+    """
+    Adds the counters of one validation summary to another.
+
+    Either summary may lack rejected_by_rule (e.g. one saved before it was
+    tracked); the per-rule counts are then merged from whichever has them.
+
+    Returns:
+        dict: the updated target
+    """
+
+    for key, value in source.items():
+        if key == "rejected_by_rule":
+            rules = target.setdefault("rejected_by_rule", new_rejection_counts())
+            for name, count in value.items():
+                rules[name] = rules.get(name, 0) + count
+        else:
+            target[key] = target.get(key, 0) + value
+    return target
+
+
+def iter_valid_transactions(transactions, region=None, min_amount=None, max_amount=None, summary=None):
+    """
+    Lazily validates transactions and applies optional filters.
+
+    Args:
+        transactions (iterable): transaction dictionaries
+        region (str): region filter (optional)
+        min_amount (float): minimum transaction amount (optional)
+        max_amount (float): maximum transaction amount (optional)
+        summary (dict): updated in place with the validate_and_filter counters (optional)
+
+    Yields:
+        dict: valid transactions that pass the filters
+    """
+
+    if summary is None:
+        summary = {}
+
+    summary.update(new_validation_summary())
+    rejected_by_rule = summary["rejected_by_rule"]
+
+    for tx in transactions:
+        summary["total_input"] += 1
+
+        if not is_valid_transaction(tx):
+            summary["invalid"] += 1
+            rejected_by_rule[rejection_rule(tx)] += 1
             continue
 
-        transaction = {
-            "TransactionID": transaction_id.strip(),
-            "Date": date.strip(),
-            "ProductID": product_id.strip(),
-            "ProductName": product_name,
-            "Quantity": quantity,
-            "UnitPrice": unit_price,
-            "CustomerID": customer_id.strip(),
-            "Region": region.strip()
-        }
+        # Region filter
+        if region and tx["Region"] != region:
+            summary["filtered_by_region"] += 1
+            continue
 
-        transactions.append(transaction)
+        # Amount filter
+        amount = tx["Quantity"] * tx["UnitPrice"]
 
-    return transactions
+        if min_amount is not None and amount < min_amount:
+            summary["filtered_by_amount"] += 1
+            continue
 
+        if max_amount is not None and amount > max_amount:
+            summary["filtered_by_amount"] += 1
+            continue
 
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+        summary["final_count"] += 1
+        yield tx
+
+
+def display_filter_summary(regions, min_amount, max_amount, final_count):
     """
-    Validates transactions and applies optional filters.
+    Prints the available filter options and the filtered record count.
+    """
+
+    print("Available regions:", regions)
+    print("Transaction amount range:", min_amount, "-", max_amount)
+    print("Records after filtering:", final_count)
+
+
+def _starts_with(values, prefix):
+    # Single-character prefix test over a string column: compares the first
+    # code point of each fixed-width string, without per-row Python calls
+    if not len(values) or values.dtype.itemsize == 0:
+        return np.zeros(len(values), dtype=bool)
+    first = values.view(np.uint32).reshape(len(values), -1)[:, 0]
+    return first == ord(prefix)
+
+
+def _category_mask(categories, codes, check):
+    # Evaluate a rule once per distinct value, then broadcast it to the rows
+    passed = np.fromiter((check(value) for value in categories), dtype=bool, count=len(categories))
+    return passed[codes]
+
+
+def validate_table(table, region=None, min_amount=None, max_amount=None):
+    """
+    Vectorized validate_and_filter over a columnar TransactionTable.
+
+    Every rule is evaluated as a boolean mask over whole columns; rules on
+    dictionary-encoded columns (ProductID, CustomerID, Region) are checked
+    once per distinct value. The region / amount filters and the display
+    statistics come from the same masks, so no row is visited in Python.
 
     Args:
-        transactions (list): list of transaction dictionaries
+        table (TransactionTable): parsed, not yet validated transactions
         region (str): region filter (optional)
         min_amount (float): minimum transaction amount (optional)
         max_amount (float): maximum transaction amount (optional)
 
     Returns:
-        tuple: (valid_transactions, invalid_count, summary_dict)
+        tuple: (filtered TransactionTable, summary_dict, display_stats),
+               display_stats being (regions, min_amount, max_amount) of
+               the valid rows
     """
 
-    total_input = len(transactions)
-    valid_transactions = []
-    invalid_count = 0
+    rules = (
+        ("bad_quantity", lambda: table.quantity <= 0),
+        ("bad_unit_price", lambda: table.unit_price <= 0),
+        ("bad_transaction_id", lambda: ~_starts_with(table.transaction_ids, "T")),
+        ("bad_product_id", lambda: ~_category_mask(
+            table.product_ids, table.product_id_codes, lambda value: value.startswith("P"))),
+        ("bad_customer_id", lambda: ~_category_mask(
+            table.customers, table.customer_codes, lambda value: value.startswith("C"))),
+        ("missing_region", lambda: ~_category_mask(table.regions, table.region_codes, bool))
+    )
+
+    valid = np.ones(len(table), dtype=bool)
+    rejected_by_rule = {}
+    for name, failed in rules:
+        failed = failed()
+        rejected_by_rule[name] = int(np.count_nonzero(failed & valid))
+        valid &= ~failed
+
+    valid_count = int(np.count_nonzero(valid))
+    amount = table.amount
+
+    keep = valid.copy()
+    if region:
+        codes = [code for code, name in enumerate(table.regions) if name == region]
+        keep &= np.isin(table.region_codes, codes)
+    in_region = int(np.count_nonzero(keep))
+
+    if min_amount is not None:
+        keep &= amount >= min_amount
+    if max_amount is not None:
+        keep &= amount <= max_amount
+    final_count = int(np.count_nonzero(keep))
 
-    # ---------- VALIDATION ----------
-    for tx in transactions:
-        try:
-            if (
-                tx.get("Quantity") <= 0 or
-                tx.get("UnitPrice") <= 0 or
-                not tx.get("TransactionID", "").startswith("T") or
-                not tx.get("ProductID", "").startswith("P") or
-                not tx.get("CustomerID", "").startswith("C") or
-                not tx.get("Region")
-            ):
-                invalid_count += 1
-                continue
+    summary = {
+        "total_input": len(table),
+        "invalid": len(table) - valid_count,
+        "filtered_by_region": valid_count - in_region,
+        "filtered_by_amount": in_region - final_count,
+        "final_count": final_count,
+        "rejected_by_rule": rejected_by_rule
+    }
 
-            valid_transactions.append(tx)
+    region_counts = np.bincount(table.region_codes[valid], minlength=len(table.regions))
+    valid_amounts = amount[valid]
+    display_stats = (
+        sorted(table.regions[code] for code in np.flatnonzero(region_counts).tolist()),
+        float(valid_amounts.min()) if valid_count else None,
+        float(valid_amounts.max()) if valid_count else None
+    )
+
+    return table.take(keep), summary, display_stats
 
-        except Exception:
-            invalid_count += 1
 
-    # ---------- FILTERING ----------
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+    """
+    Validates transactions and applies optional filters.
+
+    Validation, filtering and the displayed region / amount statistics
+    are done in a single pass. A TransactionTable is validated column-wise
+    instead (see validate_table) and a filtered table is returned.
+
+    Args:
+        transactions (list or TransactionTable): transactions to validate
+        region (str): region filter (optional)
+        min_amount (float): minimum transaction amount (optional)
+        max_amount (float): maximum transaction amount (optional)
+
+    Returns:
+        tuple: (valid_transactions, invalid_count, summary_dict); the
+               summary includes "rejected_by_rule", the invalid rows
+               counted per first failed rule
+    """
+
+    if isinstance(transactions, TransactionTable):
+        filtered, summary, (regions, low, high) = validate_table(
+            transactions, region, min_amount, max_amount
+        )
+        display_filter_summary(regions, low, high, summary["final_count"])
+        return filtered, summary["invalid"], summary
+
+    total_input = 0
+    invalid_count = 0
+    rejected_by_rule = new_rejection_counts()
     filtered_by_region = 0
     filtered_by_amount = 0
 
     filtered_transactions = []
+    regions = set()
+    low = high = None
+
+    for tx in transactions:
+        total_input += 1
+
+        # ---------- VALIDATION ----------
+        if not is_valid_transaction(tx):
+            invalid_count += 1
+            rejected_by_rule[rejection_rule(tx)] += 1
+            continue
 
-    for tx in valid_transactions:
         amount = tx["Quantity"] * tx["UnitPrice"]
+        tx_region = tx["Region"]
 
+        # Display statistics cover every valid row, before filtering
+        regions.add(tx_region)
+        if low is None or amount < low:
+            low = amount
+        if high is None or amount > high:
+            high = amount
+
+        # ---------- FILTERING ----------
         # Region filter
-        if region and tx["Region"] != region:
+        if region and tx_region != region:
             filtered_by_region += 1
             continue
 
@@ -170,15 +728,11 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
         "invalid": invalid_count,
         "filtered_by_region": filtered_by_region,
         "filtered_by_amount": filtered_by_amount,
-        "final_count": len(filtered_transactions)
+        "final_count": len(filtered_transactions),
+        "rejected_by_rule": rejected_by_rule
     }
 
     # ---------- DISPLAY (Required) ----------
-    print("Available regions:", sorted(set(tx["Region"] for tx in valid_transactions)))
-    print("Transaction amount range:",
-          min(tx["Quantity"] * tx["UnitPrice"] for tx in valid_transactions),
-          "-",
-          max(tx["Quantity"] * tx["UnitPrice"] for tx in valid_transactions))
-    print("Records after filtering:", summary["final_count"])
+    display_filter_summary(sorted(regions), low, high, summary["final_count"])
 
     return filtered_transactions, invalid_count, summary
@@ -0,0 +1,169 @@
+# utils/filter_index.py
+
+# Indexed Region / Amount Filtering
+
+import threading
+from bisect import bisect_left, bisect_right
+
+from utils.file_handler import is_valid_transaction, new_rejection_counts, rejection_rule
+
+
+class _AmountIndex:
+    # Rows sorted by amount, for binary-search range queries
+
+    def __init__(self, rows, amounts):
+        order = sorted(range(len(rows)), key=amounts.__getitem__)
+        self.amounts = [amounts[i] for i in order]
+        self.positions = [rows[i] for i in order]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def bounds(self, min_amount=None, max_amount=None):
+        lo = 0 if min_amount is None else bisect_left(self.amounts, min_amount)
+        hi = len(self.amounts) if max_amount is None else bisect_right(self.amounts, max_amount)
+        return lo, max(lo, hi)
+
+    def range(self, min_amount=None, max_amount=None):
+        lo, hi = self.bounds(min_amount, max_amount)
+        return self.positions[lo:hi]
+
+    def count(self, min_amount=None, max_amount=None):
+        lo, hi = self.bounds(min_amount, max_amount)
+        return hi - lo
+
+
+class TransactionIndex:
+    """
+    Precomputed index over validated transactions.
+
+    Validation runs once at build time, together with the available
+    regions and the amount range. The amount indexes, global and per
+    region, are built on the first filtered query; a region /
+    min_amount / max_amount query then costs two binary searches plus
+    O(k log k) to return the k matches in their original order, instead
+    of rescanning every row. An unfiltered query never needs them and
+    returns the validated rows as they are.
+    """
+
+    def __init__(self, transactions, validate=True):
+        self.total_input = 0
+        self.invalid = 0
+        self.rejected_by_rule = new_rejection_counts()
+        self.transactions = []
+
+        if validate:
+            append = self.transactions.append
+            for tx in transactions:
+                self.total_input += 1
+                if is_valid_transaction(tx):
+                    append(tx)
+                else:
+                    self.invalid += 1
+                    self.rejected_by_rule[rejection_rule(tx)] += 1
+        else:
+            self.transactions.extend(transactions)
+            self.total_input = len(self.transactions)
+
+        # Kept until the amount indexes are built from them
+        self._amounts = [tx["Quantity"] * tx["UnitPrice"] for tx in self.transactions]
+        self._all = None
+        self._by_region = None
+        self._lock = threading.Lock()
+
+        self.regions = sorted({tx["Region"] for tx in self.transactions})
+        self.min_amount = min(self._amounts) if self._amounts else None
+        self.max_amount = max(self._amounts) if self._amounts else None
+
+    def _indexes(self):
+        # Built once, on the first query that filters
+        with self._lock:
+            if self._all is None:
+                amounts = self._amounts
+                region_rows = {}
+                for position, tx in enumerate(self.transactions):
+                    region_rows.setdefault(tx["Region"], []).append(position)
+
+                self._by_region = {
+                    region: _AmountIndex(rows, [amounts[i] for i in rows])
+                    for region, rows in region_rows.items()
+                }
+                self._all = _AmountIndex(range(len(amounts)), amounts)
+                self._amounts = None
+        return self._all, self._by_region
+
+    @classmethod
+    def from_validated(cls, transactions, total_input, invalid, rejected_by_rule=None):
+        """
+        Builds the index over rows validated earlier (e.g. loaded from the
+        parsed-data cache) without re-checking them, restoring the original
+        input / invalid / per-rule rejection counts.
+        """
+
+        index = cls(transactions, validate=False)
+        index.total_input = total_input
+        index.invalid = invalid
+        if rejected_by_rule:
+            index.rejected_by_rule.update(rejected_by_rule)
+        return index
+
+    def __len__(self):
+        return len(self.transactions)
+
+    def query(self, region=None, min_amount=None, max_amount=None):
+        """
+        Returns valid transactions matching the filters.
+
+        Args:
+            region (str): region filter (optional)
+            min_amount (float): minimum transaction amount (optional)
+            max_amount (float): maximum transaction amount (optional)
+
+        Returns:
+            tuple: (filtered_transactions, invalid_count, summary_dict),
+                   the same result validate_and_filter would give; without
+                   filters the list is self.transactions itself and must
+                   not be modified
+        """
+
+        if not region and min_amount is None and max_amount is None:
+            # Nothing to filter: the validated rows, shared rather than copied
+            filtered_transactions = self.transactions
+            in_region = matched = len(filtered_transactions)
+        else:
+            all_index, by_region = self._indexes()
+            if region:
+                index = by_region.get(region)
+                in_region = len(index) if index is not None else 0
+                positions = index.range(min_amount, max_amount) if index is not None else []
+            else:
+                in_region = len(all_index)
+                positions = all_index.range(min_amount, max_amount)
+
+            filtered_transactions = [self.transactions[i] for i in sorted(positions)]
+            matched = len(positions)
+
+        summary = {
+            "total_input": self.total_input,
+            "invalid": self.invalid,
+            "filtered_by_region": len(self.transactions) - in_region,
+            "filtered_by_amount": in_region - matched,
+            "final_count": len(filtered_transactions),
+            "rejected_by_rule": dict(self.rejected_by_rule)
+        }
+
+        return filtered_transactions, self.invalid, summary
+
+    def count(self, region=None, min_amount=None, max_amount=None):
+        """
+        Counts matching transactions in O(log n) without materializing them.
+        """
+
+        if not region and min_amount is None and max_amount is None:
+            return len(self.transactions)
+
+        all_index, by_region = self._indexes()
+        if region:
+            index = by_region.get(region)
+            return index.count(min_amount, max_amount) if index is not None else 0
+        return all_index.count(min_amount, max_amount)
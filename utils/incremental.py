@@ -0,0 +1,224 @@
+# utils/incremental.py
+
+# Incremental Aggregation for Append-only Sales Files
+
+import hashlib
+import json
+import os
+
+from utils.file_handler import (
+    iter_sales_data,
+    iter_transactions,
+    iter_valid_transactions,
+    merge_validation_summary,
+    new_validation_summary
+)
+from utils.data_processor import aggregate_transactions, merge_aggregates, new_aggregates
+from utils.sketches import HyperLogLog, KLLSketch, sketch_from_dict
+
+STATE_FILE = "data/aggregate_state.json"
+FINGERPRINT_BYTES = 64 * 1024
+STATE_VERSION = 1
+
+
+def _hash_range(file, start, end):
+    # SHA-256 of bytes [start, end) of an open binary file
+    digest = hashlib.sha256()
+    file.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        block = file.read(min(remaining, 1024 * 1024))
+        if not block:
+            break
+        digest.update(block)
+        remaining -= len(block)
+    return digest.hexdigest()
+
+
+def file_checksum(filename, offset):
+    """
+    Fingerprints the first offset bytes of a file cheaply.
+
+    Hashes the first and the last FINGERPRINT_BYTES of the processed
+    prefix, so checking for a rewrite costs O(1) reads instead of
+    rehashing the whole file. This catches truncation, rotation and
+    rewrites; an in-place edit confined to the middle of a large
+    append-only file is not detected.
+
+    Returns:
+        dict: {"head": hash, "tail": hash}
+    """
+
+    with open(filename, 'rb') as file:
+        head_end = min(offset, FINGERPRINT_BYTES)
+        tail_start = max(0, offset - FINGERPRINT_BYTES)
+        return {
+            "head": _hash_range(file, 0, head_end),
+            "tail": _hash_range(file, tail_start, offset)
+        }
+
+
+def _complete_lines_end(filename):
+    # Offset just past the last newline; a partially appended line is left for next run
+    with open(filename, 'rb') as file:
+        size = file.seek(0, os.SEEK_END)
+        position = size
+        while position > 0:
+            step = min(position, 64 * 1024)
+            file.seek(position - step)
+            block = file.read(step)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                return position - step + newline + 1
+            position -= step
+    return 0
+
+
+def _to_json(aggregates):
+    # Sets become lists and sketches dicts, so the state can be stored as JSON
+    state = dict(aggregates)
+    for name in ("regions", "customers", "daily"):
+        state[name] = {
+            key: {
+                field: list(value) if isinstance(value, set)
+                else value.to_dict() if isinstance(value, (HyperLogLog, KLLSketch))
+                else value
+                for field, value in stats.items()
+            }
+            for key, stats in aggregates[name].items()
+        }
+    return state
+
+
+def _from_json(state):
+    for name in ("regions", "customers", "daily"):
+        for stats in state[name].values():
+            for field, value in stats.items():
+                if isinstance(value, list):
+                    stats[field] = set(value)
+                elif isinstance(value, dict):
+                    stats[field] = sketch_from_dict(value)
+    return state
+
+
+def load_state(state_file=STATE_FILE):
+    """
+    Loads persisted aggregate state.
+
+    Returns:
+        dict: state with aggregates, summary, source, offset and checksum,
+              or None if missing or unreadable
+    """
+
+    try:
+        with open(state_file, "r", encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+        return None
+
+    # A truncated or hand-edited state is missing keys or has the wrong
+    # shape; it is rebuilt like a missing one
+    try:
+        if not isinstance(state["summary"], dict):
+            return None
+        state["aggregates"] = _from_json(state["aggregates"])
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return None
+    return state
+
+
+def save_state(state, state_file=STATE_FILE):
+    """
+    Atomically persists aggregate state.
+    """
+
+    directory = os.path.dirname(state_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    data = dict(state, aggregates=_to_json(state["aggregates"]))
+    temp_file = f"{state_file}.{os.getpid()}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    os.replace(temp_file, state_file)
+
+
+def _is_reusable(state, filename, end, approximate):
+    # The saved prefix must still be present, unchanged, at the start of the file
+    if state is None or state.get("source") != os.path.abspath(filename):
+        return False
+
+    if bool(state["aggregates"].get("approximate")) != approximate:
+        return False
+
+    offset = state.get("offset", 0)
+    if offset > end:
+        return False
+
+    return file_checksum(filename, offset) == state.get("checksum")
+
+
+def incremental_aggregate(filename, state_file=STATE_FILE, approximate=False):
+    """
+    Aggregates only rows appended since the last run.
+
+    The aggregate state is saved with the byte offset processed so far and
+    a checksum of that prefix. On the next run only the bytes after the
+    offset are read, parsed, validated and merged in. If the file shrank
+    or its processed prefix changed, the state is discarded and the file
+    is aggregated from scratch.
+
+    Args:
+        filename (str): Path to the append-only sales_data.txt file
+        state_file (str): where the aggregate state is stored
+        approximate (bool): keep sketches instead of exact sets; a saved
+                            state in the other mode is rebuilt
+
+    Returns:
+        tuple: (aggregates, validation summary, run info dict)
+    """
+
+    end = _complete_lines_end(filename)
+    state = load_state(state_file)
+
+    if _is_reusable(state, filename, end, approximate):
+        mode = "incremental"
+        start = state["offset"]
+        aggregates = state["aggregates"]
+        summary = state["summary"]
+    else:
+        mode = "full"
+        start = 0
+        aggregates = new_aggregates(approximate)
+        summary = new_validation_summary()
+
+    if end > start:
+        new_summary = {}
+        transactions = iter_transactions(iter_sales_data(filename, start, end))
+        appended = aggregate_transactions(
+            iter_valid_transactions(transactions, summary=new_summary),
+            new_aggregates(approximate)
+        )
+        merge_aggregates(aggregates, appended)
+        merge_validation_summary(summary, new_summary)
+
+    save_state({
+        "version": STATE_VERSION,
+        "source": os.path.abspath(filename),
+        "offset": end,
+        "checksum": file_checksum(filename, end),
+        "summary": summary,
+        "aggregates": aggregates
+    }, state_file)
+
+    run_info = {
+        "mode": mode,
+        "start_offset": start,
+        "end_offset": end,
+        "bytes_processed": end - start
+    }
+
+    return aggregates, summary, run_info
@@ -0,0 +1,233 @@
+# utils/instrumentation.py
+
+# Pipeline Stage Instrumentation
+
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """
+    Returns the process peak resident set size so far, or None if unknown.
+    """
+
+    if resource is None:
+        return None
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _row_count(value):
+    # Rows carried by a stage input / output, when that is meaningful
+    if isinstance(value, tuple) and value and isinstance(value[0], (list, dict)):
+        return len(value[0])
+    if isinstance(value, (list, dict)):
+        return len(value)
+    return None
+
+
+class PipelineMetrics:
+    """
+    Records wall time, CPU time, rows in/out, allocations and peak RSS
+    for each pipeline stage and instrumented function call.
+
+    Allocation tracking uses tracemalloc and is opt-in, because tracing
+    every allocation slows allocation-heavy stages down noticeably.
+    Stages may be nested; a parent's allocation peak includes its children.
+    """
+
+    def __init__(self, trace_allocations=False):
+        self.trace_allocations = trace_allocations
+        self.stages = []
+        self.counters = {}
+        self.started_at = time.time()
+        self._stack = []
+
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Measures a block of code as one stage.
+
+        The yielded record can be updated, e.g. record["rows_out"] = n.
+        """
+
+        record = {
+            "stage": name,
+            "parent": self._stack[-1]["stage"] if self._stack else None,
+            "rows_in": rows_in,
+            "rows_out": None
+        }
+
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Keep the parent's peak before resetting it for the child
+                parent = self._stack[-1]
+                parent["_alloc_peak"] = max(parent["_alloc_peak"], peak)
+            tracemalloc.reset_peak()
+            record["_alloc_start"] = current
+            record["_alloc_peak"] = current
+
+        self._stack.append(record)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield record
+        finally:
+            record["wall_seconds"] = round(time.perf_counter() - wall_start, 6)
+            record["cpu_seconds"] = round(time.process_time() - cpu_start, 6)
+            self._stack.pop()
+
+            if self.trace_allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(record.pop("_alloc_peak"), peak)
+                start = record.pop("_alloc_start")
+                record["alloc_net_bytes"] = current - start
+                record["alloc_peak_bytes"] = peak - start
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent["_alloc_peak"] = max(parent["_alloc_peak"], peak)
+
+            record["peak_rss_bytes"] = peak_rss_bytes()
+            self.stages.append(record)
+
+    def record(self, name, wall_seconds, cpu_seconds=None, rows_in=None, rows_out=None):
+        """
+        Adds a stage that was timed elsewhere, e.g. in a worker thread.
+        """
+
+        self.stages.append({
+            "stage": name,
+            "parent": None,
+            "rows_in": rows_in,
+            "rows_out": rows_out,
+            "wall_seconds": wall_seconds,
+            "cpu_seconds": cpu_seconds,
+            "peak_rss_bytes": peak_rss_bytes()
+        })
+
+    def instrument(self, func, name=None):
+        """
+        Wraps a function so every call is recorded as a stage.
+
+        rows_in is taken from the first argument and rows_out from the
+        result when they are lists or dicts.
+        """
+
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rows_in = _row_count(args[0]) if args else None
+            with self.stage(stage_name, rows_in) as record:
+                result = func(*args, **kwargs)
+                record["rows_out"] = _row_count(result)
+            return result
+
+        return wrapper
+
+    def summary(self, status="ok"):
+        """
+        Returns the run summary as a JSON-serializable dict.
+        """
+
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "status": status,
+            "total_wall_seconds": round(time.time() - self.started_at, 6),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": self.stages,
+            "counters": self.counters
+        }
+
+    def to_prometheus(self, status="ok", prefix="sales_pipeline"):
+        """
+        Renders the summary in Prometheus textfile-collector format.
+        """
+
+        metrics = [
+            ("wall_seconds", "Wall-clock time of the stage in seconds"),
+            ("cpu_seconds", "CPU time of the stage in seconds"),
+            ("rows_in", "Rows passed into the stage"),
+            ("rows_out", "Rows produced by the stage"),
+            ("alloc_net_bytes", "Net bytes allocated by the stage (tracemalloc)"),
+            ("alloc_peak_bytes", "Peak bytes allocated during the stage (tracemalloc)"),
+            ("peak_rss_bytes", "Process peak RSS at the end of the stage")
+        ]
+
+        lines = []
+        for key, help_text in metrics:
+            samples = [
+                (stage["stage"], stage[key])
+                for stage in self.stages
+                if stage.get(key) is not None
+            ]
+            if not samples:
+                continue
+
+            metric = f"{prefix}_stage_{key}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for stage_name, value in samples:
+                label = stage_name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{metric}{{stage="{label}"}} {value}')
+
+        # Numeric counters, e.g. counters["result_cache"]["hits"] -> sales_pipeline_result_cache_hits
+        for group, values in self.counters.items():
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                metric = f"{prefix}_{group}_{key}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+
+        summary = self.summary(status)
+        lines.append(f"# HELP {prefix}_run_wall_seconds Total wall-clock time of the run")
+        lines.append(f"# TYPE {prefix}_run_wall_seconds gauge")
+        lines.append(f"{prefix}_run_wall_seconds {summary['total_wall_seconds']}")
+        lines.append(f"# HELP {prefix}_run_success 1 if the run completed without error")
+        lines.append(f"# TYPE {prefix}_run_success gauge")
+        lines.append(f"{prefix}_run_success {1 if status == 'ok' else 0}")
+        lines.append(f"# HELP {prefix}_run_timestamp_seconds Unix time the run started")
+        lines.append(f"# TYPE {prefix}_run_timestamp_seconds gauge")
+        lines.append(f"{prefix}_run_timestamp_seconds {round(self.started_at, 3)}")
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_file=None, prometheus_file=None, status="ok"):
+        """
+        Writes the JSON and / or Prometheus summaries atomically.
+        """
+
+        outputs = []
+        if json_file:
+            outputs.append((json_file, json.dumps(self.summary(status), indent=2) + "\n"))
+        if prometheus_file:
+            outputs.append((prometheus_file, self.to_prometheus(status)))
+
+        for path, content in outputs:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Write then rename so a textfile collector never reads a partial file
+            temp_file = f"{path}.{os.getpid()}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as file:
+                file.write(content)
+            os.replace(temp_file, path)
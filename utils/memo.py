@@ -0,0 +1,263 @@
+# utils/memo.py
+
+# Result Cache for the Analysis Functions
+
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+def dataset_fingerprint(data):
+    """
+    Cheap identity of an aggregate state.
+
+    An aggregate state is identified by the dict itself plus its
+    transaction count, total revenue and number of keys, which change
+    whenever rows are aggregated or merged into it. Nothing is hashed in
+    full, so this is O(1). Transaction lists have no fingerprint: a row
+    edited in place would not change any cheap identity, so results over
+    raw rows are never cached.
+
+    Returns:
+        tuple: fingerprint, or None if the data cannot be fingerprinted
+    """
+
+    if not isinstance(data, dict) or "transaction_count" not in data:
+        return None
+    return (
+        "aggregates", id(data), data["transaction_count"], data["total_revenue"],
+        len(data["products"]), len(data["customers"]), len(data["daily"])
+    )
+
+
+def _copy(value):
+    # Containers are copied all the way down so callers cannot change a
+    # cached result; numbers, strings and other leaves are shared
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return value.copy()
+    return value
+
+
+def _weight(value):
+    # Results count toward the size limit by their number of items. An
+    # aggregate state counts every region, product, customer and date
+    # entry, plus the members of its exact distinct sets (sketches in
+    # approximate mode are fixed-size, so each key counts once).
+    if isinstance(value, dict) and "transaction_count" in value:
+        weight = (
+            len(value["regions"]) + len(value["products"])
+            + len(value["customers"]) + len(value["daily"])
+        )
+        if not value.get("approximate"):
+            weight += sum(len(stats["products"]) for stats in value["customers"].values())
+            weight += sum(len(stats["customers"]) for stats in value["daily"].values())
+        return max(1, weight)
+
+    try:
+        return max(1, len(value))
+    except TypeError:
+        return 1
+
+
+class ResultCache:
+    """
+    LRU cache of analysis results keyed on dataset fingerprint and parameters.
+
+    Only the fingerprint of the source data is kept, never the data
+    itself, so the cache does not hold freed datasets in memory. Entries
+    for at most max_datasets fingerprints are kept; when another one
+    arrives, every entry of the least recently used one is dropped.
+    Entries are also evicted least recently used first once there are
+    more than max_entries of them or their results hold more than
+    max_items items in total (see _weight; a cached aggregate state of
+    n rows weighs at most a few times n).
+
+    Every caller gets its own copy of a cached result, so modifying a
+    returned dict or list never changes what later callers see.
+    """
+
+    def __init__(self, max_entries=256, max_items=1_000_000, max_datasets=4):
+        self.max_entries = max_entries
+        self.max_items = max_items
+        self.max_datasets = max_datasets
+        self.enabled = True
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.by_function = {}
+
+        self._entries = OrderedDict()
+        self._datasets = OrderedDict()
+        self._items = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, name, source, params, compute):
+        """
+        Returns the cached result of compute() for (name, source, params).
+
+        Args:
+            name (str): function name, part of the key and of the counters
+            source: aggregate state the result depends on
+            params (tuple): hashable call parameters
+            compute (callable): builds the result on a miss
+
+        Returns:
+            a copy of the cached or freshly computed result; compute() runs
+            uncached if source has no fingerprint
+        """
+
+        fingerprint = dataset_fingerprint(source) if self.enabled else None
+        if fingerprint is None:
+            return compute()
+
+        key = (name, fingerprint, params)
+
+        with self._lock:
+            counters = self.by_function.setdefault(name, {"hits": 0, "misses": 0})
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._datasets.move_to_end(fingerprint)
+                self.hits += 1
+                counters["hits"] += 1
+                return _copy(entry[1])
+
+            self.misses += 1
+            counters["misses"] += 1
+
+        result = compute()
+
+        with self._lock:
+            self._store(key, fingerprint, result)
+        return _copy(result)
+
+    def _store(self, key, fingerprint, result):
+        weight = _weight(result)
+        if weight > self.max_items:
+            # Caching it would flush every other entry and then itself
+            return
+
+        if fingerprint in self._datasets:
+            self._datasets.move_to_end(fingerprint)
+        else:
+            self._datasets[fingerprint] = None
+            while len(self._datasets) > self.max_datasets:
+                stale, _ = self._datasets.popitem(last=False)
+                for old_key in [k for k in self._entries if k[1] == stale]:
+                    self._evict(old_key)
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._items -= previous[0]
+
+        self._entries[key] = (weight, result)
+        self._items += weight
+
+        while self._entries and (len(self._entries) > self.max_entries or self._items > self.max_items):
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key):
+        weight, _ = self._entries.pop(key)
+        self._items -= weight
+        self.evictions += 1
+
+        # Forget the dataset once none of its entries remain
+        fingerprint = key[1]
+        if not any(k[1] == fingerprint for k in self._entries):
+            self._datasets.pop(fingerprint, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._datasets.clear()
+            self._items = 0
+
+    @contextmanager
+    def disabled(self):
+        """
+        Bypasses the cache inside the block (e.g. to time cold calls).
+        """
+
+        previous = self.enabled
+        self.enabled = False
+        try:
+            yield self
+        finally:
+            self.enabled = previous
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, hit_rate, evictions, entries, items and
+                  per-function hit / miss counts
+        """
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "items": self._items,
+                "datasets": len(self._datasets),
+                "functions": {name: dict(counts) for name, counts in self.by_function.items()}
+            }
+
+
+# Shared by every memoized analysis function
+RESULT_CACHE = ResultCache()
+
+
+def memoize(func):
+    """
+    Caches an analysis function in RESULT_CACHE.
+
+    The function must take transactions and aggregates arguments. Only
+    calls that pass aggregates are cached (the function only reads them
+    then), keyed on the aggregate state plus every other argument after
+    defaults are applied, so f(tx, n=5) and f(tx, 5) share an entry.
+    Calls on raw transactions always run, as the rows may have been
+    edited since the last call.
+    """
+
+    signature = inspect.signature(func)
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+
+        aggregates = arguments.get("aggregates")
+        if aggregates is None:
+            return func(*args, **kwargs)
+
+        params = tuple(
+            (key, value) for key, value in arguments.items()
+            if key not in ("transactions", "aggregates")
+        )
+
+        try:
+            hash(params)
+        except TypeError:
+            return func(*args, **kwargs)
+
+        return RESULT_CACHE.get_or_compute(name, aggregates, params, lambda: func(*args, **kwargs))
+
+    wrapper.uncached = func
+    return wrapper
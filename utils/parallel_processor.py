@@ -0,0 +1,157 @@
+# utils/parallel_processor.py
+
+# Parallel Parsing & Aggregation
+
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.file_handler import (
+    detect_encoding,
+    iter_sales_data,
+    iter_transactions,
+    iter_valid_transactions,
+    merge_validation_summary,
+    new_validation_summary,
+    split_file_ranges,
+    stream_transactions
+)
+from utils.data_processor import aggregate_transactions, merge_aggregates, new_aggregates
+
+
+def aggregate_range(filename, start, end, region=None, min_amount=None, max_amount=None,
+                    approximate=False, encoding=None):
+    """
+    Reads, parses, validates and aggregates one byte range of a file.
+
+    Args:
+        filename (str): Path to sales_data.txt file
+        start (int): newline-aligned start offset
+        end (int): newline-aligned end offset
+        region (str): region filter (optional)
+        min_amount (float): minimum transaction amount (optional)
+        max_amount (float): maximum transaction amount (optional)
+        approximate (bool): build sketches instead of exact sets
+        encoding (str): encoding of the whole file (default: detected
+                        over this range only)
+
+    Returns:
+        tuple: (partial aggregate state, partial validation summary)
+    """
+
+    summary = {}
+    transactions = iter_transactions(iter_sales_data(filename, start, end, encoding))
+    valid = iter_valid_transactions(transactions, region, min_amount, max_amount, summary)
+
+    return aggregate_transactions(valid, new_aggregates(approximate)), summary
+
+
+def parallel_aggregate(filename, workers=None, chunk_size=64 * 1024 * 1024,
+                       region=None, min_amount=None, max_amount=None, approximate=False):
+    """
+    Aggregates a sales file across several processes.
+
+    The file is split into fixed-size, newline-aligned byte ranges that are
+    processed in a ProcessPoolExecutor. Partial results are merged in file
+    order, so the output depends only on chunk_size and never on how many
+    workers ran or which finished first.
+
+    Args:
+        filename (str): Path to sales_data.txt file
+        workers (int): number of worker processes (default: CPU count)
+        chunk_size (int): approximate size of each byte range
+        region (str): region filter (optional)
+        min_amount (float): minimum transaction amount (optional)
+        max_amount (float): maximum transaction amount (optional)
+        approximate (bool): build mergeable sketches instead of exact sets
+
+    Returns:
+        tuple: (aggregate state, validation summary)
+    """
+
+    ranges = split_file_ranges(filename, chunk_size)
+    # Detected once for the whole file, so every range decodes the same way
+    encoding = detect_encoding(filename)
+    args = [
+        (filename, start, end, region, min_amount, max_amount, approximate, encoding)
+        for start, end in ranges
+    ]
+
+    aggregates = new_aggregates(approximate)
+    summary = new_validation_summary()
+
+    def merge(partials):
+        # Each partial is merged as soon as it is next in file order, so
+        # only results that finished early are held at once
+        for partial_aggregates, partial_summary in partials:
+            merge_aggregates(aggregates, partial_aggregates)
+            merge_validation_summary(summary, partial_summary)
+
+    if workers == 1 or len(ranges) <= 1:
+        merge(aggregate_range(*arg) for arg in args)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            merge(executor.map(aggregate_range, *zip(*args)))
+
+    return aggregates, summary
+
+
+def load_range(filename, start, end, approximate=False, encoding=None):
+    """
+    Like aggregate_range, but also sends back the valid rows of the range.
+
+    Returns:
+        tuple: (partial aggregate state, partial validation summary with
+               the number of raw "lines" read, list of valid Transaction
+               records)
+    """
+
+    counts = {}
+    summary = {}
+    transactions = stream_transactions(filename, counts, start, end, encoding)
+    valid = list(iter_valid_transactions(transactions, summary=summary))
+    summary["lines"] = counts["lines"]
+
+    return aggregate_transactions(valid, new_aggregates(approximate)), summary, valid
+
+
+def parallel_load(filename, workers=None, chunk_size=64 * 1024 * 1024, approximate=False):
+    """
+    Reads, parses, validates and aggregates a sales file across processes,
+    keeping the valid rows.
+
+    This is the whole of parallel_aggregate plus the rows, so a caller
+    that also needs the rows (e.g. for enrichment) reads the file once,
+    in parallel, instead of parsing it serially first. Ranges are merged
+    in file order, so rows come back in file order.
+
+    Args:
+        filename (str): Path to sales_data.txt file
+        workers (int): number of worker processes (default: CPU count)
+        chunk_size (int): approximate size of each byte range
+        approximate (bool): build mergeable sketches instead of exact sets
+
+    Returns:
+        tuple: (aggregate state, validation summary with "lines", list of
+               valid Transaction records)
+    """
+
+    ranges = split_file_ranges(filename, chunk_size)
+    encoding = detect_encoding(filename)
+    args = [(filename, start, end, approximate, encoding) for start, end in ranges]
+
+    aggregates = new_aggregates(approximate)
+    summary = new_validation_summary()
+    transactions = []
+
+    def merge(partials):
+        for partial_aggregates, partial_summary, rows in partials:
+            merge_aggregates(aggregates, partial_aggregates)
+            merge_validation_summary(summary, partial_summary)
+            transactions.extend(rows)
+
+    if workers == 1 or len(ranges) <= 1:
+        merge(load_range(*arg) for arg in args)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            merge(executor.map(load_range, *zip(*args)))
+
+    return aggregates, summary, transactions
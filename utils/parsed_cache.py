@@ -0,0 +1,174 @@
+# utils/parsed_cache.py
+
+# Columnar Cache of Parsed Transactions
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from utils.transaction_table import TransactionTable
+
+CACHE_DIR = "data/.parsed_cache"
+CACHE_VERSION = 1
+
+# Array columns stored as one .npy file each, so they can be memory-mapped
+ARRAY_COLUMNS = (
+    "transaction_ids", "quantity", "unit_price", "region_codes",
+    "product_codes", "product_id_codes", "customer_codes", "date_codes"
+)
+
+# Small category lists stored in the manifest
+CATEGORY_COLUMNS = ("regions", "products", "product_ids", "customers", "dates")
+
+
+def source_key(filename, digest=True):
+    """
+    Identifies the current contents of a source file.
+
+    Returns:
+        dict: {"size", "mtime_ns", "sha256"}; sha256 is omitted when
+              digest is False
+    """
+
+    stat = os.stat(filename)
+    key = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    if digest:
+        sha = hashlib.sha256()
+        with open(filename, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                sha.update(block)
+        key["sha256"] = sha.hexdigest()
+
+    return key
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "manifest.json"), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get("version") != CACHE_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, "manifest.json")
+    temp_file = f"{path}.{os.getpid()}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as file:
+        json.dump(manifest, file)
+    os.replace(temp_file, path)
+
+
+def load_parsed_cache(filename, cache_dir=CACHE_DIR):
+    """
+    Loads the cached, validated transactions for a source file.
+
+    The cache is used only if the file's size matches and its SHA-256
+    equals the one recorded when the cache was written. If only the mtime
+    differs (e.g. the file was touched) the contents are still checked by
+    hash and the cache is kept. Arrays are memory-mapped, not read.
+
+    Args:
+        filename (str): source sales_data.txt
+        cache_dir (str): cache directory
+
+    Returns:
+        tuple: (TransactionTable, counts dict) or None on a miss
+    """
+
+    manifest = _read_manifest(cache_dir)
+    if manifest is None or manifest.get("source") != os.path.abspath(filename):
+        return None
+
+    try:
+        key = source_key(filename, digest=False)
+    except OSError:
+        return None
+
+    cached_key = manifest["key"]
+    if key["size"] != cached_key["size"]:
+        return None
+
+    if key["mtime_ns"] != cached_key["mtime_ns"]:
+        if source_key(filename)["sha256"] != cached_key["sha256"]:
+            return None
+        manifest["key"]["mtime_ns"] = key["mtime_ns"]
+        _write_manifest(cache_dir, manifest)
+
+    columns_dir = os.path.join(cache_dir, manifest["columns"])
+    try:
+        arrays = {
+            name: np.load(os.path.join(columns_dir, f"{name}.npy"), mmap_mode="r")
+            for name in ARRAY_COLUMNS
+        }
+    except (OSError, ValueError):
+        return None
+
+    table = TransactionTable(
+        arrays["transaction_ids"],
+        arrays["quantity"],
+        arrays["unit_price"],
+        arrays["region_codes"], manifest["categories"]["regions"],
+        arrays["product_codes"], manifest["categories"]["products"],
+        arrays["product_id_codes"], manifest["categories"]["product_ids"],
+        arrays["customer_codes"], manifest["categories"]["customers"],
+        arrays["date_codes"], manifest["categories"]["dates"]
+    )
+
+    return table, manifest["counts"]
+
+
+def save_parsed_cache(filename, key, table, counts, cache_dir=CACHE_DIR):
+    """
+    Stores validated transactions for a source file in columnar form.
+
+    Columns are written to a fresh directory named after the source hash;
+    the manifest pointing at it is replaced last, so a crash mid-write
+    leaves the previous cache intact.
+
+    key must be taken with source_key() before the file was read. Taking
+    it afterwards would record the contents of a file appended during
+    the read, and every later run would load the shorter table as if it
+    were current.
+
+    Args:
+        filename (str): source sales_data.txt
+        key (dict): source_key(filename) from before the rows were read
+        table (TransactionTable): validated transactions
+        counts (dict): read / parse / validation counts to restore on a hit
+        cache_dir (str): cache directory
+    """
+
+    name = key["sha256"][:16]
+    columns_dir = os.path.join(cache_dir, name)
+    temp_dir = f"{columns_dir}.{os.getpid()}.tmp"
+
+    os.makedirs(temp_dir, exist_ok=True)
+    for column in ARRAY_COLUMNS:
+        np.save(os.path.join(temp_dir, f"{column}.npy"), np.ascontiguousarray(getattr(table, column)))
+
+    if os.path.isdir(columns_dir):
+        shutil.rmtree(columns_dir)
+    os.replace(temp_dir, columns_dir)
+
+    _write_manifest(cache_dir, {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(filename),
+        "key": key,
+        "columns": name,
+        "counts": counts,
+        "categories": {column: getattr(table, column) for column in CATEGORY_COLUMNS}
+    })
+
+    # Drop column sets of earlier file versions
+    for entry in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, entry)
+        if entry != name and os.path.isdir(path) and not entry.endswith(".tmp"):
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,359 @@
+# utils/query_service.py
+
+# Local HTTP Query Service
+#
+# Usage (from the project root):
+#   python -m utils.query_service --file data/sales_data.txt --port 8765
+#
+# Endpoints (all GET, JSON responses):
+#   /health
+#   /region-sales?n=&region=&min_amount=&max_amount=
+#   /top-products?n=5&region=&min_amount=&max_amount=
+#   /customers?n=10&region=&min_amount=&max_amount=
+#   /daily-trend?start=&end=&region=&min_amount=&max_amount=
+#   /transactions?region=&min_amount=&max_amount=&limit=100&offset=0
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from utils.file_handler import read_sales_data, parse_transactions
+from utils.filter_index import TransactionIndex
+from utils.memo import RESULT_CACHE
+from utils.parsed_cache import load_parsed_cache
+from utils.data_processor import (
+    aggregate_transactions,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend
+)
+
+DEFAULT_PORT = 8765
+CACHE_ENTRIES = 1024
+# Filtered aggregate states kept per dataset; each holds per-customer and
+# per-date rollups, so this is far smaller than the response cache
+AGGREGATE_ENTRIES = 16
+
+
+def _signature(filename):
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class SalesDataset:
+    """
+    Transactions, filter index and aggregate state loaded once.
+
+    Validated rows come from the parsed-data cache when main.py has
+    already written it for this file, otherwise the file is read and
+    parsed. Aggregates for a region / amount filter are built on first use
+    and kept in a small LRU (AGGREGATE_ENTRIES), so every endpoint with the
+    same filter shares one pass; the unfiltered state is always kept.
+    The service swaps in a new SalesDataset on reload, so requests in
+    flight keep using the old one.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        # Taken before reading, so a write during the load triggers another reload
+        self.signature = _signature(filename)
+        self.loaded_at = time.time()
+
+        cached = load_parsed_cache(filename)
+        if cached:
+            table, counts = cached
+            self.index = TransactionIndex.from_validated(
+                table.iter_rows(), counts["total_input"], counts["invalid"],
+                counts.get("rejected_by_rule")
+            )
+        else:
+            self.index = TransactionIndex(parse_transactions(read_sales_data(filename)))
+        self._all = aggregate_transactions(self.index.transactions)
+        self._aggregates = OrderedDict()
+        self._lock = threading.Lock()
+
+    def changed(self):
+        try:
+            return _signature(self.filename) != self.signature
+        except OSError:
+            return False
+
+    def aggregates(self, region=None, min_amount=None, max_amount=None):
+        key = (region, min_amount, max_amount)
+        if key == (None, None, None):
+            return self._all
+
+        # Built under the lock, so concurrent misses for one filter share a single pass
+        with self._lock:
+            aggregates = self._aggregates.get(key)
+            if aggregates is not None:
+                self._aggregates.move_to_end(key)
+                return aggregates
+
+            transactions, _, _ = self.index.query(region, min_amount, max_amount)
+            aggregates = self._aggregates[key] = aggregate_transactions(transactions)
+            if len(self._aggregates) > AGGREGATE_ENTRIES:
+                self._aggregates.popitem(last=False)
+            return aggregates
+
+
+class QueryService:
+    """
+    Serves analytics over a SalesDataset with a response cache.
+
+    Responses are cached as encoded JSON keyed on the endpoint and its
+    normalized query parameters. The cache is dropped whenever the
+    dataset is reloaded.
+    """
+
+    def __init__(self, filename, cache_entries=CACHE_ENTRIES):
+        self.filename = filename
+        self.dataset = SalesDataset(filename)
+        self.cache_entries = cache_entries
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.last_reload_error = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self.routes = {
+            "/health": self._health,
+            "/region-sales": self._region_sales,
+            "/top-products": self._top_products,
+            "/customers": self._customers,
+            "/daily-trend": self._daily_trend,
+            "/transactions": self._transactions
+        }
+
+    # ---------- RELOAD ----------
+
+    def reload(self):
+        dataset = SalesDataset(self.filename)
+        with self._lock:
+            self.dataset = dataset
+            self._cache.clear()
+            self.reloads += 1
+
+    def watch(self, interval=2.0):
+        """
+        Polls the source file and reloads when its size or mtime changes.
+
+        A failed reload (e.g. of a half-written file) is logged, counted
+        in /health and retried on the next poll; the previous data keeps
+        being served and the watcher never stops on an error.
+        """
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    if self.dataset.changed():
+                        self.reload()
+                except Exception as e:
+                    self.reload_errors += 1
+                    self.last_reload_error = f"{type(e).__name__}: {e}"
+                    print(f"Reload failed, keeping previous data: {self.last_reload_error}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------- REQUESTS ----------
+
+    def handle(self, path, params):
+        """
+        Answers one request.
+
+        Returns:
+            tuple: (status code, JSON body bytes, cache hit flag)
+        """
+
+        handler = self.routes.get(path)
+        if handler is None:
+            return 404, _encode({"error": f"Unknown endpoint: {path}"}), False
+
+        key = (path, tuple(sorted(params.items())))
+        if path != "/health":
+            with self._lock:
+                body = self._cache.get(key)
+                if body is not None:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    return 200, body, True
+
+        # Answer from one snapshot; if a reload swaps it out meanwhile the
+        # body is still returned but not cached, so it cannot outlive the reload
+        dataset = self.dataset
+        try:
+            body = _encode(handler(dataset, params))
+        except ValueError as e:
+            return 400, _encode({"error": str(e)}), False
+
+        if path != "/health":
+            with self._lock:
+                self.cache_misses += 1
+                if dataset is self.dataset:
+                    self._cache[key] = body
+                    if len(self._cache) > self.cache_entries:
+                        self._cache.popitem(last=False)
+
+        return 200, body, False
+
+    def _health(self, dataset, params):
+        return {
+            "status": "ok",
+            "file": dataset.filename,
+            "rows": len(dataset.index),
+            "loaded_at": dataset.loaded_at,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "last_reload_error": self.last_reload_error,
+            "cache": {"entries": len(self._cache), "hits": self.cache_hits, "misses": self.cache_misses},
+            "result_cache": RESULT_CACHE.stats()
+        }
+
+    def _region_sales(self, dataset, params):
+        aggregates = dataset.aggregates(*_filters(params))
+        return region_wise_sales(None, aggregates, n=_int(params, "n", minimum=0))
+
+    def _top_products(self, dataset, params):
+        aggregates = dataset.aggregates(*_filters(params))
+        return [
+            {"product": product, "quantity": quantity, "revenue": revenue}
+            for product, quantity, revenue in top_selling_products(None, n=_int(params, "n", 5, minimum=0), aggregates=aggregates)
+        ]
+
+    def _customers(self, dataset, params):
+        aggregates = dataset.aggregates(*_filters(params))
+        return customer_analysis(None, aggregates, n=_int(params, "n", 10, minimum=0))
+
+    def _daily_trend(self, dataset, params):
+        aggregates = dataset.aggregates(*_filters(params))
+        start, end = params.get("start"), params.get("end")
+        return {
+            date: stats
+            for date, stats in daily_sales_trend(None, aggregates).items()
+            if (not start or date >= start) and (not end or date <= end)
+        }
+
+    def _transactions(self, dataset, params):
+        transactions, invalid_count, summary = dataset.index.query(*_filters(params))
+        offset = _int(params, "offset", 0, minimum=0)
+        limit = _int(params, "limit", 100, minimum=0)
+        return {
+            "summary": summary,
+            "transactions": [dict(tx) for tx in transactions[offset:offset + limit]]
+        }
+
+
+def _encode(data):
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def _int(params, name, default=None, minimum=None):
+    value = params.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return value
+
+
+def _float(params, name):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        value = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number") from None
+    # nan / inf parse as floats but make every comparison meaningless
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number")
+    return value
+
+
+def _filters(params):
+    return params.get("region") or None, _float(params, "min_amount"), _float(params, "max_amount")
+
+
+def make_handler(service):
+    """
+    Builds a request handler class bound to a QueryService.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so clients can reuse one connection; headers and body
+        # go out in separate writes, so Nagle would stall each response ~40 ms
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            status, body, hit = service.handle(url.path, dict(parse_qsl(url.query)))
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-Cache", "HIT" if hit else "MISS")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Per-request logging would dominate the latency
+            pass
+
+    return Handler
+
+
+def serve(filename="data/sales_data.txt", host="127.0.0.1", port=DEFAULT_PORT, watch_interval=2.0):
+    """
+    Loads the dataset and serves it until interrupted.
+    """
+
+    service = QueryService(filename)
+    if watch_interval:
+        service.watch(watch_interval)
+
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Serving {len(service.dataset.index)} transactions on http://{host}:{server.server_port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve sales analytics over HTTP")
+    parser.add_argument("--file", default="data/sales_data.txt")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--watch", type=float, default=2.0,
+                        help="seconds between file-change checks (0 disables reload)")
+    args = parser.parse_args(argv)
+
+    serve(args.file, args.host, args.port, args.watch)
+
+
+if __name__ == "__main__":
+    main()
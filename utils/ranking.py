@@ -0,0 +1,29 @@
+# utils/ranking.py
+
+# Bounded Top-K Rankings
+
+import heapq
+
+
+def top_k(items, n, key):
+    """
+    Returns the n items with the largest key, highest first.
+
+    Uses a bounded heap, so ranking m items costs O(m log n) instead of a
+    full O(m log m) sort. Ties keep their input order, exactly like
+    sorted(items, key=key, reverse=True)[:n]. Pass n=None to get the
+    entire ordering (a full sort).
+
+    Args:
+        items (iterable): items to rank
+        n (int): number of items to keep, or None for all
+        key (callable): ranking key
+
+    Returns:
+        list: top items in descending key order
+    """
+
+    if n is None:
+        return sorted(items, key=key, reverse=True)
+    return heapq.nlargest(n, items, key=key)
+
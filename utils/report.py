@@ -0,0 +1,472 @@
+# utils/report.py
+
+# Report Model & Renderers
+
+import csv
+import html
+import io
+import json
+import os
+from datetime import datetime
+
+from utils.data_processor import aggregate_transactions
+from utils.ranking import top_k
+from utils.time_series import SalesTimeSeries
+
+FORMAT_EXTENSIONS = {"text": ".txt", "json": ".json", "csv": ".csv", "html": ".html"}
+
+
+def build_report_model(transactions, enriched_transactions, aggregates=None, generated_at=None):
+    """
+    Computes every report section once from the aggregate state.
+
+    The model holds plain numbers and strings only; renderers just format
+    it, so producing several output formats never recomputes anything.
+
+    Args:
+        transactions (list): validated transactions
+        enriched_transactions (list): rows from enrich_sales_data()
+        aggregates (dict): precomputed aggregate_transactions() result (optional)
+        generated_at (datetime): report timestamp (default: now)
+
+    Returns:
+        dict: JSON-serializable report model
+    """
+
+    if aggregates is None:
+        aggregates = aggregate_transactions(transactions)
+
+    region_summary = aggregates["regions"]
+    product_summary = aggregates["products"]
+    customer_summary = aggregates["customers"]
+    daily_summary = aggregates["daily"]
+
+    total_transactions = aggregates["transaction_count"]
+    total_revenue = aggregates["total_revenue"]
+
+    # Dates are parsed once for the period trends; unparsable ones are
+    # counted, and still take part in the date range as in the daily table
+    time_series = SalesTimeSeries(daily_summary)
+
+    regions = [
+        {
+            "region": region,
+            "revenue": stats["revenue"],
+            "percentage": (stats["revenue"] / total_revenue) * 100,
+            "transactions": stats["count"]
+        }
+        for region, stats in sorted(
+            region_summary.items(), key=lambda x: x[1]["revenue"], reverse=True
+        )
+    ]
+
+    top_products = [
+        {"rank": rank, "product": product, "quantity": stats["quantity"], "revenue": stats["revenue"]}
+        for rank, (product, stats) in enumerate(
+            top_k(product_summary.items(), 5, key=lambda x: x[1]["quantity"]), 1
+        )
+    ]
+
+    top_customers = [
+        {"rank": rank, "customer": customer_id, "spent": stats["spent"], "orders": stats["count"]}
+        for rank, (customer_id, stats) in enumerate(
+            top_k(customer_summary.items(), 5, key=lambda x: x[1]["spent"]), 1
+        )
+    ]
+
+    daily = [
+        {
+            "date": date,
+            "revenue": stats["revenue"],
+            "transactions": stats["count"],
+            "customers": len(stats["customers"])
+        }
+        for date, stats in sorted(daily_summary.items())
+    ]
+
+    def periods(buckets):
+        return [
+            {
+                "period": period,
+                "start": stats["start"],
+                "end": stats["end"],
+                "revenue": stats["revenue"],
+                "transactions": stats["transaction_count"],
+                "customers": stats["unique_customers"]
+            }
+            for period, stats in buckets.items()
+        ]
+
+    rolling = [
+        {"window_days": window, "end_date": time_series.end_date, "revenue": time_series.trailing_revenue(window)}
+        for window in (7, 30)
+    ]
+
+    best_day = None
+    if daily_summary:
+        date, stats = max(daily_summary.items(), key=lambda x: x[1]["revenue"])
+        best_day = {"date": date, "revenue": stats["revenue"], "transactions": stats["count"]}
+
+    low_products = sorted(
+        (
+            {"product": product, "quantity": stats["quantity"], "revenue": stats["revenue"]}
+            for product, stats in product_summary.items()
+            if stats["quantity"] < 10
+        ),
+        key=lambda x: x["quantity"]
+    )
+
+    region_averages = [
+        {"region": region, "value": stats["revenue"] / stats["count"] if stats["count"] else 0}
+        for region, stats in region_summary.items()
+    ]
+
+    # One pass over the enriched rows
+    matched = 0
+    unmatched = set()
+    for tx in enriched_transactions:
+        if tx.get("API_Match"):
+            matched += 1
+        else:
+            unmatched.add(tx["ProductName"])
+
+    return {
+        "generated_at": (generated_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S'),
+        "summary": {
+            "total_revenue": total_revenue,
+            "total_transactions": total_transactions,
+            "average_order_value": total_revenue / total_transactions if total_transactions else 0,
+            "start_date": min(daily_summary) if daily_summary else None,
+            "end_date": max(daily_summary) if daily_summary else None,
+            "unparsed_dates": len(time_series.unparsed)
+        },
+        "regions": regions,
+        "top_products": top_products,
+        "top_customers": top_customers,
+        "daily": daily,
+        "monthly": periods(time_series.monthly()),
+        "weekly": periods(time_series.weekly()),
+        "rolling": rolling,
+        "performance": {
+            "best_day": best_day,
+            "low_product_threshold": 10,
+            "low_products": low_products,
+            "region_averages": region_averages
+        },
+        "api": {
+            "enriched_records": matched,
+            "success_rate": (matched / len(enriched_transactions)) * 100 if enriched_transactions else 0,
+            "unmatched_products": sorted(unmatched)
+        }
+    }
+
+
+# ---------- RENDERERS ----------
+
+def render_text(model):
+    """
+    Renders the fixed-width text report (output/sales_report.txt).
+    """
+
+    summary = model["summary"]
+    performance = model["performance"]
+    api = model["api"]
+    rule = "-" * 44 + "\n"
+
+    out = [
+        "=" * 44 + "\n",
+        "           SALES ANALYTICS REPORT\n",
+        f"     Generated: {model['generated_at']}\n",
+        f"     Records Processed: {summary['total_transactions']}\n",
+        "=" * 44 + "\n\n",
+
+        "OVERALL SUMMARY\n",
+        rule,
+        f"Total Revenue:        ₹{summary['total_revenue']:,.2f}\n",
+        f"Total Transactions:   {summary['total_transactions']}\n",
+        f"Average Order Value:  ₹{summary['average_order_value']:,.2f}\n",
+        f"Date Range:           {summary['start_date']} to {summary['end_date']}\n"
+    ]
+    if summary["unparsed_dates"]:
+        out.append(f"Unparsed Dates:       {summary['unparsed_dates']} (not in weekly/monthly trends)\n")
+
+    out += [
+        "\n",
+        "REGION-WISE PERFORMANCE\n",
+        rule,
+        f"{'Region':10}{'Sales':15}{'% of Total':12}{'Transactions'}\n"
+    ]
+    out.extend(
+        f"{row['region']:10}₹{row['revenue']:,.2f}   {row['percentage']:6.2f}%      {row['transactions']}\n"
+        for row in model["regions"]
+    )
+
+    out += ["\n", "TOP 5 PRODUCTS\n", rule, f"{'Rank':5}{'Product':20}{'Qty':8}{'Revenue'}\n"]
+    out.extend(
+        f"{row['rank']:<5}{row['product']:20}{row['quantity']:<8}₹{row['revenue']:,.2f}\n"
+        for row in model["top_products"]
+    )
+
+    out += ["\n", "TOP 5 CUSTOMERS\n", rule, f"{'Rank':5}{'Customer':12}{'Spent':15}{'Orders'}\n"]
+    out.extend(
+        f"{row['rank']:<5}{row['customer']:12}₹{row['spent']:,.2f}   {row['orders']}\n"
+        for row in model["top_customers"]
+    )
+
+    out += ["\n", "DAILY SALES TREND\n", rule, f"{'Date':12}{'Revenue':15}{'Txns':8}{'Customers'}\n"]
+    out.extend(
+        f"{row['date']:12}₹{row['revenue']:,.2f}   {row['transactions']:<8}{row['customers']}\n"
+        for row in model["daily"]
+    )
+
+    for title, section in (("MONTHLY SALES TREND", "monthly"), ("WEEKLY SALES TREND", "weekly")):
+        out += ["\n", f"{title}\n", rule, f"{'Period':12}{'Revenue':15}{'Txns':8}{'Customers'}\n"]
+        out.extend(
+            f"{row['period']:12}₹{row['revenue']:,.2f}   {row['transactions']:<8}{row['customers']}\n"
+            for row in model[section]
+        )
+
+    rolling_end = model["rolling"][0]["end_date"] if model["rolling"] else None
+    out.append(f"\nRolling Revenue (to {rolling_end}):\n")
+    out.extend(
+        f"- Last {row['window_days']} days: ₹{row['revenue']:,.2f}\n"
+        for row in model["rolling"]
+    )
+
+    best_day = performance["best_day"]
+    out += ["\n", "PRODUCT PERFORMANCE ANALYSIS\n", rule, "Best Selling Day:\n"]
+    if best_day:
+        out.append(
+            f"{best_day['date']} | Revenue: ₹{best_day['revenue']:,.2f} "
+            f"| Transactions: {best_day['transactions']}\n\n"
+        )
+    else:
+        out.append("None\n\n")
+
+    out.append(f"Low Performing Products (Quantity < {performance['low_product_threshold']}):\n")
+    if performance["low_products"]:
+        out.extend(
+            f"- {row['product']} | Qty: {row['quantity']} | Revenue: ₹{row['revenue']:,.2f}\n"
+            for row in performance["low_products"]
+        )
+    else:
+        out.append("None\n")
+
+    out.append("\nAverage Transaction Value per Region:\n")
+    out.extend(
+        f"- {row['region']}: ₹{row['value']:,.2f}\n"
+        for row in performance["region_averages"]
+    )
+
+    out += [
+        "\n",
+        "API ENRICHMENT SUMMARY\n",
+        rule,
+        f"Enriched Records: {api['enriched_records']}\n",
+        f"Success Rate:    {api['success_rate']:.2f}%\n",
+        "Unmatched Products:\n"
+    ]
+    out.extend(f"- {product}\n" for product in api["unmatched_products"])
+
+    return "".join(out)
+
+
+def render_json(model):
+    """
+    Renders the report model as JSON.
+    """
+
+    return json.dumps(model, indent=2, ensure_ascii=False) + "\n"
+
+
+def _csv_rows(model):
+    # Long format: one (section, key, metric, value) row per number
+    yield "report", "", "generated_at", model["generated_at"]
+
+    for metric, value in model["summary"].items():
+        yield "summary", "", metric, value
+
+    tables = (
+        ("regions", "region", model["regions"]),
+        ("top_products", "product", model["top_products"]),
+        ("top_customers", "customer", model["top_customers"]),
+        ("daily", "date", model["daily"]),
+        ("monthly", "period", model["monthly"]),
+        ("weekly", "period", model["weekly"]),
+        ("rolling", "window_days", model["rolling"]),
+        ("low_products", "product", model["performance"]["low_products"]),
+        ("region_averages", "region", model["performance"]["region_averages"])
+    )
+    for section, key_field, rows in tables:
+        for row in rows:
+            for metric, value in row.items():
+                if metric != key_field:
+                    yield section, row[key_field], metric, value
+
+    best_day = model["performance"]["best_day"]
+    if best_day:
+        for metric, value in best_day.items():
+            if metric != "date":
+                yield "best_day", best_day["date"], metric, value
+
+    api = model["api"]
+    yield "api", "", "enriched_records", api["enriched_records"]
+    yield "api", "", "success_rate", api["success_rate"]
+    for product in api["unmatched_products"]:
+        yield "unmatched_products", product, "", ""
+
+
+def render_csv(model):
+    """
+    Renders the report model as long-format CSV (section, key, metric, value).
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(("section", "key", "metric", "value"))
+    writer.writerows(_csv_rows(model))
+    return buffer.getvalue()
+
+
+def _html_table(title, columns, rows):
+    escape = html.escape
+    out = [f"<h2>{escape(title)}</h2>\n<table>\n<tr>"]
+    out.extend(f"<th>{escape(label)}</th>" for label, _ in columns)
+    out.append("</tr>\n")
+    for row in rows:
+        out.append("<tr>")
+        out.extend(f"<td>{escape(fmt(row))}</td>" for _, fmt in columns)
+        out.append("</tr>\n")
+    out.append("</table>\n")
+    return "".join(out)
+
+
+def render_html(model):
+    """
+    Renders the report model as a standalone HTML page.
+    """
+
+    def money(field):
+        return lambda row: f"₹{row[field]:,.2f}"
+
+    def plain(field):
+        return lambda row: str(row[field])
+
+    summary = model["summary"]
+    performance = model["performance"]
+    api = model["api"]
+    best_day = performance["best_day"]
+    rolling_end = model["rolling"][0]["end_date"] if model["rolling"] else None
+
+    overview = [
+        {"metric": "Total Revenue", "value": f"₹{summary['total_revenue']:,.2f}"},
+        {"metric": "Total Transactions", "value": summary["total_transactions"]},
+        {"metric": "Average Order Value", "value": f"₹{summary['average_order_value']:,.2f}"},
+        {"metric": "Date Range", "value": f"{summary['start_date']} to {summary['end_date']}"}
+    ]
+    if summary["unparsed_dates"]:
+        overview.append({"metric": "Unparsed Dates", "value": summary["unparsed_dates"]})
+
+    out = [
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n",
+        "<title>Sales Analytics Report</title>\n",
+        "<style>body{font-family:sans-serif}table{border-collapse:collapse;margin-bottom:1em}"
+        "th,td{border:1px solid #ccc;padding:2px 8px;text-align:right}"
+        "th:first-child,td:first-child{text-align:left}</style>\n",
+        "</head>\n<body>\n<h1>Sales Analytics Report</h1>\n",
+        f"<p>Generated: {html.escape(model['generated_at'])}<br>"
+        f"Records Processed: {summary['total_transactions']}</p>\n",
+
+        _html_table("Overall Summary", [("Metric", plain("metric")), ("Value", plain("value"))], overview),
+        _html_table("Region-wise Performance", [
+            ("Region", plain("region")), ("Sales", money("revenue")),
+            ("% of Total", lambda row: f"{row['percentage']:.2f}%"), ("Transactions", plain("transactions"))
+        ], model["regions"]),
+        _html_table("Top 5 Products", [
+            ("Rank", plain("rank")), ("Product", plain("product")),
+            ("Qty", plain("quantity")), ("Revenue", money("revenue"))
+        ], model["top_products"]),
+        _html_table("Top 5 Customers", [
+            ("Rank", plain("rank")), ("Customer", plain("customer")),
+            ("Spent", money("spent")), ("Orders", plain("orders"))
+        ], model["top_customers"]),
+        _html_table("Daily Sales Trend", [
+            ("Date", plain("date")), ("Revenue", money("revenue")),
+            ("Txns", plain("transactions")), ("Customers", plain("customers"))
+        ], model["daily"]),
+        _html_table("Monthly Sales Trend", [
+            ("Month", plain("period")), ("Revenue", money("revenue")),
+            ("Txns", plain("transactions")), ("Customers", plain("customers"))
+        ], model["monthly"]),
+        _html_table("Weekly Sales Trend", [
+            ("Week", plain("period")), ("Revenue", money("revenue")),
+            ("Txns", plain("transactions")), ("Customers", plain("customers"))
+        ], model["weekly"]),
+        _html_table(f"Rolling Revenue (to {rolling_end})", [
+            ("Window (days)", plain("window_days")), ("Revenue", money("revenue"))
+        ], model["rolling"]),
+        _html_table("Best Selling Day", [
+            ("Date", plain("date")), ("Revenue", money("revenue")), ("Transactions", plain("transactions"))
+        ], [best_day] if best_day else []),
+        _html_table(f"Low Performing Products (Quantity < {performance['low_product_threshold']})", [
+            ("Product", plain("product")), ("Qty", plain("quantity")), ("Revenue", money("revenue"))
+        ], performance["low_products"]),
+        _html_table("Average Transaction Value per Region", [
+            ("Region", plain("region")), ("Value", money("value"))
+        ], performance["region_averages"]),
+        _html_table("API Enrichment Summary", [("Metric", plain("metric")), ("Value", plain("value"))], [
+            {"metric": "Enriched Records", "value": api["enriched_records"]},
+            {"metric": "Success Rate", "value": f"{api['success_rate']:.2f}%"},
+            {"metric": "Unmatched Products", "value": ", ".join(api["unmatched_products"])}
+        ]),
+        "</body>\n</html>\n"
+    ]
+
+    return "".join(out)
+
+
+RENDERERS = {
+    "text": render_text,
+    "json": render_json,
+    "csv": render_csv,
+    "html": render_html
+}
+
+
+def report_path(output_file, fmt):
+    """
+    Path for a format next to output_file (sales_report.txt -> sales_report.html).
+    """
+
+    return os.path.splitext(output_file)[0] + FORMAT_EXTENSIONS[fmt]
+
+
+def write_report(model, output_file, fmt="text"):
+    """
+    Renders the model and writes it with a single buffered write.
+
+    The file is written to a temp file and renamed into place, so a
+    reader never sees a half-written report; the temp file is removed
+    if writing or renaming fails.
+    """
+
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unsupported report format: {fmt}")
+
+    content = RENDERERS[fmt](model)
+
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_file = f"{output_file}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file, "w", encoding="utf-8", newline="") as file:
+            file.write(content)
+        os.replace(temp_file, output_file)
+    except BaseException:
+        try:
+            os.unlink(temp_file)
+        except OSError:
+            pass
+        raise
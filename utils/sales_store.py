@@ -0,0 +1,407 @@
+# utils/sales_store.py
+
+# Embedded SQLite Storage Backend
+
+import sqlite3
+from itertools import islice
+
+from utils.data_processor import aggregate_transactions, new_aggregates
+
+STORE_FILE = "data/sales.db"
+INSERT_BATCH_ROWS = 50000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    unit_price REAL NOT NULL,
+    customer_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    amount REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_region_amount ON transactions (region, amount);
+CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions (amount);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_customer ON transactions (customer_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_product ON transactions (product_name);
+
+CREATE TABLE IF NOT EXISTS products (
+    product_id INTEGER PRIMARY KEY,
+    title TEXT,
+    category TEXT,
+    brand TEXT,
+    rating REAL
+);
+
+-- Materialized rollups; rowid keeps first-seen order for tie-breaking
+CREATE TABLE IF NOT EXISTS region_rollup (
+    region TEXT PRIMARY KEY,
+    revenue REAL NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS product_rollup (
+    product_name TEXT PRIMARY KEY,
+    quantity INTEGER NOT NULL,
+    revenue REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS customer_rollup (
+    customer_id TEXT PRIMARY KEY,
+    spent REAL NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    date TEXT PRIMARY KEY,
+    revenue REAL NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS customer_products (
+    customer_id TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    PRIMARY KEY (customer_id, product_name)
+);
+CREATE TABLE IF NOT EXISTS daily_customers (
+    date TEXT NOT NULL,
+    customer_id TEXT NOT NULL,
+    PRIMARY KEY (date, customer_id)
+);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    transaction_count INTEGER NOT NULL,
+    total_revenue REAL NOT NULL
+);
+"""
+
+ROLLUP_TABLES = (
+    "region_rollup", "product_rollup", "customer_rollup", "daily_rollup",
+    "customer_products", "daily_customers", "totals"
+)
+
+
+class SalesStore:
+    """
+    SQLite store for validated transactions, the product catalog and
+    materialized region / product / customer / day rollups.
+
+    Rows are bulk-loaded with executemany in one SQLite transaction per
+    ingest. The rollups are built with aggregate_transactions and merged
+    into their tables, so the analysis methods below return the same
+    values as the data_processor functions by reading a few small indexed
+    tables instead of re-reading the sales file. Ad-hoc filters (region,
+    amount, date range) run against indexes on the transactions table.
+    """
+
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        # WAL lets readers query while a bulk load is running
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- INGESTION ----------
+
+    def clear(self):
+        """
+        Removes all transactions and rollups (the product catalog is kept).
+        """
+
+        with self.connection:
+            self.connection.execute("DELETE FROM transactions")
+            for table in ROLLUP_TABLES:
+                self.connection.execute(f"DELETE FROM {table}")
+
+    def ingest(self, transactions, replace=False, aggregates=None):
+        """
+        Bulk-loads validated transactions and updates the rollups.
+
+        Args:
+            transactions (iterable): validated transactions
+            replace (bool): clear existing data first
+            aggregates (dict): exact aggregate_transactions() result for
+                               exactly these transactions (optional); saves
+                               aggregating them again while loading
+
+        Returns:
+            int: number of rows ingested
+        """
+
+        if replace:
+            self.clear()
+
+        precomputed = aggregates is not None
+        if not precomputed:
+            aggregates = new_aggregates()
+        rows = iter(transactions)
+        total = 0
+
+        with self.connection:
+            while True:
+                batch = list(islice(rows, INSERT_BATCH_ROWS))
+                if not batch:
+                    break
+
+                self.connection.executemany(
+                    "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            tx["TransactionID"], tx["Date"], tx["ProductID"], tx["ProductName"],
+                            tx["Quantity"], tx["UnitPrice"], tx["CustomerID"], tx["Region"],
+                            tx["Quantity"] * tx["UnitPrice"]
+                        )
+                        for tx in batch
+                    ]
+                )
+                if not precomputed:
+                    aggregate_transactions(batch, aggregates)
+                total += len(batch)
+
+            self._merge_rollups(aggregates)
+
+        return total
+
+    def _merge_rollups(self, aggregates):
+        execute = self.connection.execute
+        executemany = self.connection.executemany
+
+        executemany(
+            "INSERT INTO region_rollup VALUES (?, ?, ?) ON CONFLICT (region) DO UPDATE SET "
+            "revenue = revenue + excluded.revenue, count = count + excluded.count",
+            [(key, stats["revenue"], stats["count"]) for key, stats in aggregates["regions"].items()]
+        )
+        executemany(
+            "INSERT INTO product_rollup VALUES (?, ?, ?) ON CONFLICT (product_name) DO UPDATE SET "
+            "quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue",
+            [(key, stats["quantity"], stats["revenue"]) for key, stats in aggregates["products"].items()]
+        )
+        executemany(
+            "INSERT INTO customer_rollup VALUES (?, ?, ?) ON CONFLICT (customer_id) DO UPDATE SET "
+            "spent = spent + excluded.spent, count = count + excluded.count",
+            [(key, stats["spent"], stats["count"]) for key, stats in aggregates["customers"].items()]
+        )
+        executemany(
+            "INSERT INTO daily_rollup VALUES (?, ?, ?) ON CONFLICT (date) DO UPDATE SET "
+            "revenue = revenue + excluded.revenue, count = count + excluded.count",
+            [(key, stats["revenue"], stats["count"]) for key, stats in aggregates["daily"].items()]
+        )
+        executemany(
+            "INSERT OR IGNORE INTO customer_products VALUES (?, ?)",
+            [
+                (key, product)
+                for key, stats in aggregates["customers"].items()
+                for product in stats["products"]
+            ]
+        )
+        executemany(
+            "INSERT OR IGNORE INTO daily_customers VALUES (?, ?)",
+            [
+                (key, customer_id)
+                for key, stats in aggregates["daily"].items()
+                for customer_id in stats["customers"]
+            ]
+        )
+        execute(
+            "INSERT INTO totals VALUES (1, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+            "transaction_count = transaction_count + excluded.transaction_count, "
+            "total_revenue = total_revenue + excluded.total_revenue",
+            (aggregates["transaction_count"], aggregates["total_revenue"])
+        )
+
+    def save_products(self, product_mapping):
+        """
+        Stores the API catalog (create_product_mapping() output).
+        """
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?)",
+                [
+                    (product_id, info.get("title"), info.get("category"),
+                     info.get("brand"), info.get("rating"))
+                    for product_id, info in product_mapping.items()
+                ]
+            )
+
+    # ---------- ANALYSIS (same results as data_processor) ----------
+
+    def _totals(self):
+        row = self.connection.execute(
+            "SELECT transaction_count, total_revenue FROM totals WHERE id = 1"
+        ).fetchone()
+        return row if row else (0, 0.0)
+
+    def calculate_total_revenue(self):
+        return round(self._totals()[1], 2)
+
+    def region_wise_sales(self, n=None):
+        total_revenue = self.calculate_total_revenue()
+        rows = self.connection.execute(
+            "SELECT region, revenue, count FROM region_rollup "
+            "ORDER BY ROUND(revenue, 2) DESC, rowid LIMIT ?",
+            (-1 if n is None else n,)
+        )
+        return {
+            region: {
+                "total_sales": round(revenue, 2),
+                "transaction_count": count,
+                "percentage": round((revenue / total_revenue) * 100, 2)
+            }
+            for region, revenue, count in rows
+        }
+
+    def top_selling_products(self, n=5):
+        rows = self.connection.execute(
+            "SELECT product_name, quantity, revenue FROM product_rollup "
+            "ORDER BY quantity DESC, rowid LIMIT ?",
+            (-1 if n is None else n,)
+        )
+        return [(product, quantity, round(revenue, 2)) for product, quantity, revenue in rows]
+
+    def customer_analysis(self, n=None):
+        # One grouped query for the top customers and their products;
+        # customer_products is already distinct per (customer, product).
+        # char(31) cannot occur in a parsed field, unlike ","
+        rows = self.connection.execute(
+            "SELECT c.customer_id, c.spent, c.count, group_concat(p.product_name, char(31)) "
+            "FROM (SELECT rowid AS position, customer_id, spent, count FROM customer_rollup "
+            "      ORDER BY spent DESC, rowid LIMIT ?) c "
+            "LEFT JOIN customer_products p ON p.customer_id = c.customer_id "
+            "GROUP BY c.customer_id ORDER BY c.spent DESC, c.position",
+            (-1 if n is None else n,)
+        )
+
+        customer_data = {}
+        for customer_id, spent, count, products in rows:
+            customer_data[customer_id] = {
+                "total_spent": spent,
+                "purchase_count": count,
+                "products_bought": sorted(products.split("\x1f")) if products else [],
+                "avg_order_value": round(spent / count, 2)
+            }
+        return customer_data
+
+    def daily_sales_trend(self, start_date=None, end_date=None):
+        rows = self.connection.execute(
+            "SELECT d.date, d.revenue, d.count, "
+            "(SELECT COUNT(*) FROM daily_customers c WHERE c.date = d.date) "
+            "FROM daily_rollup d WHERE d.date >= ? AND d.date <= ? ORDER BY d.date",
+            (start_date or "", end_date or "￿")
+        )
+        return {
+            date: {
+                "revenue": round(revenue, 2),
+                "transaction_count": count,
+                "unique_customers": customers
+            }
+            for date, revenue, count, customers in rows
+        }
+
+    def find_peak_sales_day(self):
+        row = self.connection.execute(
+            "SELECT date, revenue, count FROM daily_rollup "
+            "WHERE revenue > 0 ORDER BY revenue DESC, rowid LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return (None, 0.0, 0)
+        return (row[0], round(row[1], 2), row[2])
+
+    def low_performing_products(self, threshold=10):
+        rows = self.connection.execute(
+            "SELECT product_name, quantity, revenue FROM product_rollup "
+            "WHERE quantity < ? ORDER BY quantity, rowid",
+            (threshold,)
+        )
+        return [(product, quantity, round(revenue, 2)) for product, quantity, revenue in rows]
+
+    def aggregates(self):
+        """
+        Loads the rollups as an aggregate state, so any data_processor view
+        or the report can run on the store without reading transactions.
+        """
+
+        aggregates = new_aggregates()
+        aggregates["transaction_count"], aggregates["total_revenue"] = self._totals()
+        execute = self.connection.execute
+
+        for region, revenue, count in execute("SELECT region, revenue, count FROM region_rollup ORDER BY rowid"):
+            aggregates["regions"][region] = {"revenue": revenue, "count": count}
+        for product, quantity, revenue in execute(
+                "SELECT product_name, quantity, revenue FROM product_rollup ORDER BY rowid"):
+            aggregates["products"][product] = {"quantity": quantity, "revenue": revenue}
+        for customer_id, spent, count in execute(
+                "SELECT customer_id, spent, count FROM customer_rollup ORDER BY rowid"):
+            aggregates["customers"][customer_id] = {"spent": spent, "count": count, "products": set()}
+        for date, revenue, count in execute("SELECT date, revenue, count FROM daily_rollup ORDER BY rowid"):
+            aggregates["daily"][date] = {"revenue": revenue, "count": count, "customers": set()}
+
+        for customer_id, product in execute("SELECT customer_id, product_name FROM customer_products"):
+            aggregates["customers"][customer_id]["products"].add(product)
+        for date, customer_id in execute("SELECT date, customer_id FROM daily_customers"):
+            aggregates["daily"][date]["customers"].add(customer_id)
+
+        return aggregates
+
+    # ---------- AD-HOC QUERIES ----------
+
+    def _where(self, region, min_amount, max_amount, start_date, end_date):
+        clauses, params = [], []
+        for clause, value in (
+            ("region = ?", region),
+            ("amount >= ?", min_amount),
+            ("amount <= ?", max_amount),
+            ("date >= ?", start_date),
+            ("date <= ?", end_date)
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query_transactions(self, region=None, min_amount=None, max_amount=None,
+                           start_date=None, end_date=None):
+        """
+        Returns matching transactions as dictionaries, in ingestion order.
+        """
+
+        where, params = self._where(region, min_amount, max_amount, start_date, end_date)
+        rows = self.connection.execute(
+            "SELECT transaction_id, date, product_id, product_name, quantity, unit_price, "
+            f"customer_id, region FROM transactions{where} ORDER BY rowid",
+            params
+        )
+        fields = ("TransactionID", "Date", "ProductID", "ProductName",
+                  "Quantity", "UnitPrice", "CustomerID", "Region")
+        return [dict(zip(fields, row)) for row in rows]
+
+    def sales_summary(self, region=None, min_amount=None, max_amount=None,
+                      start_date=None, end_date=None):
+        """
+        Revenue, transaction and customer counts for an ad-hoc filter,
+        computed in SQL over the indexed transactions table.
+
+        Returns:
+            dict: {"revenue", "transaction_count", "unique_customers"}
+        """
+
+        where, params = self._where(region, min_amount, max_amount, start_date, end_date)
+        revenue, count, customers = self.connection.execute(
+            "SELECT COALESCE(SUM(amount), 0.0), COUNT(*), COUNT(DISTINCT customer_id) "
+            f"FROM transactions{where}",
+            params
+        ).fetchone()
+        return {
+            "revenue": round(revenue, 2),
+            "transaction_count": count,
+            "unique_customers": customers
+        }
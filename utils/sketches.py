@@ -0,0 +1,244 @@
+# utils/sketches.py
+
+# Mergeable Approximate Sketches
+
+import base64
+import hashlib
+import math
+import random
+
+HLL_PRECISION = 12
+KLL_K = 200
+
+
+def hash64(value):
+    """
+    Stable 64-bit hash of a value's text.
+
+    Unlike hash(), the result is the same in every process and run, so
+    sketches built in workers or in earlier runs can be merged.
+    """
+
+    digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class HyperLogLog:
+    """
+    Approximate distinct counter.
+
+    Uses 2**precision one-byte registers (4 KiB at the default precision
+    of 12) no matter how many distinct values are added. The relative
+    standard error is 1.04 / sqrt(2**precision), about 1.6% at precision
+    12; small cardinalities are estimated by linear counting and are
+    close to exact. len() returns the rounded estimate so code written
+    for sets keeps working.
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(1 << precision)
+
+    @property
+    def relative_error(self):
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value):
+        self.add_hash(hash64(value))
+
+    def add_hash(self, hashed):
+        # Top bits pick the register; rank = leading zeros of the rest + 1
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m) if m >= 128 else {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        if estimate <= 2.5 * m:
+            zeros = self.registers.count(0)
+            if zeros:
+                return m * math.log(m / zeros)
+        return estimate
+
+    def __len__(self):
+        return int(round(self.count()))
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    __ior__ = merge
+
+    def copy(self):
+        return HyperLogLog(self.precision, self.registers)
+
+    def to_dict(self):
+        return {
+            "type": "hll",
+            "precision": self.precision,
+            "registers": base64.b64encode(bytes(self.registers)).decode("ascii")
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["precision"], base64.b64decode(data["registers"]))
+
+
+class KLLSketch:
+    """
+    Approximate quantile sketch (Karnin-Lang-Liberty).
+
+    Keeps O(k) values in a hierarchy of compactors; each compaction sorts
+    a level and promotes every other value with doubled weight. The
+    normalized rank error is about 2.446 / k**0.9433 (1.7% at k=200) with
+    99% confidence, independent of the number of values. Min and max are
+    exact. The compaction coin flips come from a seeded generator, so the
+    same input always yields the same sketch.
+    """
+
+    def __init__(self, k=KLL_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.min = None
+        self.max = None
+        self.compactors = [[]]
+        self._rng = random.Random(seed)
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    @property
+    def rank_error(self):
+        return 2.446 / self.k ** 0.9433
+
+    def _capacity(self, height):
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil((2 / 3) ** depth * self.k)) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def add(self, value):
+        if self.n == 0 or value < self.min:
+            self.min = value
+        if self.n == 0 or value > self.max:
+            self.max = value
+        self.n += 1
+
+        self.compactors[0].append(value)
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def _compress(self):
+        for height in range(len(self.compactors)):
+            level = self.compactors[height]
+            if len(level) < self._capacity(height):
+                continue
+
+            if height + 1 == len(self.compactors):
+                self._grow()
+
+            level.sort()
+            # An odd leftover stays behind at this level
+            leftover = [level.pop()] if len(level) % 2 else []
+            offset = self._rng.random() < 0.5
+            self.compactors[height + 1].extend(level[offset::2])
+            self.compactors[height] = leftover
+
+            self._size = sum(len(c) for c in self.compactors)
+            if self._size < self._max_size:
+                break
+
+    def merge(self, other):
+        if other.n == 0:
+            return self
+
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for height, level in enumerate(other.compactors):
+            self.compactors[height].extend(level)
+
+        self.min = other.min if self.n == 0 else min(self.min, other.min)
+        self.max = other.max if self.n == 0 else max(self.max, other.max)
+        self.n += other.n
+
+        self._size = sum(len(c) for c in self.compactors)
+        while self._size >= self._max_size:
+            self._compress()
+        return self
+
+    __ior__ = merge
+
+    def quantile(self, q):
+        """
+        Returns the approximate value at quantile q (0 <= q <= 1).
+        """
+
+        if self.n == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        weighted = sorted(
+            (value, 1 << height)
+            for height, level in enumerate(self.compactors)
+            for value in level
+        )
+        total = sum(weight for _, weight in weighted)
+        target = q * total
+
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return self.max
+
+    def copy(self):
+        return KLLSketch.from_dict(self.to_dict())
+
+    def to_dict(self):
+        return {
+            "type": "kll",
+            "k": self.k,
+            "n": self.n,
+            "min": self.min,
+            "max": self.max,
+            "compactors": [list(level) for level in self.compactors]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["k"])
+        sketch.n = data["n"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        sketch.compactors = [list(level) for level in data["compactors"]]
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.compactors)))
+        sketch._size = sum(len(c) for c in sketch.compactors)
+        return sketch
+
+
+SKETCH_TYPES = {"hll": HyperLogLog, "kll": KLLSketch}
+
+
+def sketch_from_dict(data):
+    """
+    Restores a sketch saved with to_dict().
+    """
+
+    return SKETCH_TYPES[data["type"]].from_dict(data)
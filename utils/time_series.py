@@ -0,0 +1,254 @@
+# utils/time_series.py
+
+# Time-bucketed Sales Rollups
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+from functools import lru_cache
+from itertools import accumulate
+
+from utils.data_processor import aggregate_transactions
+
+
+@lru_cache(maxsize=None)
+def date_ordinal(text):
+    """
+    Parses a YYYY-MM-DD date string into a proleptic Gregorian ordinal.
+
+    Each distinct string is parsed once per process.
+
+    Returns:
+        int: ordinal day number, or None if the text is not a valid date
+    """
+
+    try:
+        return date.fromisoformat(text.strip()).toordinal()
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _union(values):
+    # Exact sets are unioned and sketches merged, without touching the inputs
+    merged = None
+    for value in values:
+        if merged is None:
+            merged = value.copy()
+        else:
+            merged |= value
+    return merged
+
+
+class SalesTimeSeries:
+    """
+    Calendar-ordered daily revenue built from the daily rollup.
+
+    Dates are parsed once into ordinals and sorted, with prefix sums of
+    revenue and transaction counts over the days that had sales. Any
+    window total is then two binary searches, so weekly, monthly and
+    rolling views never rescan rows or re-sum days, and memory follows
+    the number of sale days rather than the calendar span (one stray
+    year-1900 date costs one entry, not a century of empty days).
+    Dates that cannot be parsed are kept in unparsed.
+    """
+
+    def __init__(self, daily):
+        days = []
+        self.unparsed = []
+
+        for label, stats in daily.items():
+            ordinal = date_ordinal(label)
+            if ordinal is None:
+                self.unparsed.append(label)
+            else:
+                days.append((ordinal, label, stats))
+
+        days.sort(key=lambda day: day[0])
+        self.days = days
+
+        self._ordinals = [ordinal for ordinal, _, _ in days]
+        self._revenue = list(accumulate((stats["revenue"] for _, _, stats in days), initial=0.0))
+        self._count = list(accumulate((stats["count"] for _, _, stats in days), initial=0))
+
+        self.start = days[0][0] if days else None
+        self.end = days[-1][0] if days else None
+
+    @classmethod
+    def from_transactions(cls, transactions, aggregates=None):
+        if aggregates is None:
+            aggregates = aggregate_transactions(transactions)
+        return cls(aggregates["daily"])
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def start_date(self):
+        return self.days[0][1] if self.days else None
+
+    @property
+    def end_date(self):
+        return self.days[-1][1] if self.days else None
+
+    def _bounds(self, first, last):
+        # Prefix-sum positions of the sale days within [first, last]
+        lo = bisect_left(self._ordinals, first)
+        return lo, max(lo, bisect_right(self._ordinals, last))
+
+    def window_revenue(self, first, last):
+        """
+        Total revenue of the inclusive ordinal range [first, last], in O(log days).
+        """
+
+        lo, hi = self._bounds(first, last)
+        return self._revenue[hi] - self._revenue[lo]
+
+    def window_count(self, first, last):
+        """
+        Transaction count of the inclusive ordinal range [first, last], in O(log days).
+        """
+
+        lo, hi = self._bounds(first, last)
+        return self._count[hi] - self._count[lo]
+
+    def daily(self):
+        """
+        Returns:
+            dict: date -> revenue / transaction_count / unique_customers,
+                  in calendar order
+        """
+
+        return {
+            label: {
+                "revenue": round(stats["revenue"], 2),
+                "transaction_count": stats["count"],
+                "unique_customers": len(stats["customers"])
+            }
+            for _, label, stats in self.days
+        }
+
+    def _buckets(self, bucket_of):
+        # bucket_of(date) -> (key, first ordinal, last ordinal); days are sorted,
+        # so every bucket is one contiguous run
+        buckets = {}
+        run = []
+        key = bounds = None
+
+        def close():
+            first, last = bounds
+            buckets[key] = {
+                "start": date.fromordinal(max(first, self.start)).isoformat(),
+                "end": date.fromordinal(min(last, self.end)).isoformat(),
+                "revenue": round(self.window_revenue(first, last), 2),
+                "transaction_count": self.window_count(first, last),
+                "unique_customers": len(_union(stats["customers"] for stats in run))
+            }
+
+        for ordinal, _, stats in self.days:
+            day_key, first, last = bucket_of(date.fromordinal(ordinal))
+            if day_key != key:
+                if run:
+                    close()
+                key, bounds, run = day_key, (first, last), []
+            run.append(stats)
+
+        if run:
+            close()
+        return buckets
+
+    def weekly(self):
+        """
+        Returns:
+            dict: ISO week ("2024-W49") -> start / end / revenue /
+                  transaction_count / unique_customers
+        """
+
+        def iso_week(day):
+            year, week, weekday = day.isocalendar()
+            first = day.toordinal() - weekday + 1
+            return f"{year}-W{week:02d}", first, first + 6
+
+        return self._buckets(iso_week)
+
+    def monthly(self):
+        """
+        Returns:
+            dict: month ("2024-12") -> start / end / revenue /
+                  transaction_count / unique_customers
+        """
+
+        def month(day):
+            first = day.replace(day=1)
+            if day.month == 12:
+                following = date(day.year + 1, 1, 1)
+            else:
+                following = date(day.year, day.month + 1, 1)
+            return first.strftime("%Y-%m"), first.toordinal(), following.toordinal() - 1
+
+        return self._buckets(month)
+
+    def rolling(self, window=7):
+        """
+        Trailing window totals ending on each date with sales.
+
+        Only sale days are visited, and each window start is found by
+        bisect, so an outlier date far from the rest adds one row rather
+        than one per calendar day in between.
+
+        Args:
+            window (int): window length in days
+
+        Returns:
+            dict: date -> revenue / transaction_count / average_daily_revenue
+                  over the window ending on that date
+        """
+
+        if window < 1:
+            raise ValueError("window must be at least 1 day")
+
+        result = {}
+        for ordinal in sorted(set(self._ordinals)):
+            first = ordinal - window + 1
+            revenue = self.window_revenue(first, ordinal)
+            result[date.fromordinal(ordinal).isoformat()] = {
+                "revenue": round(revenue, 2),
+                "transaction_count": self.window_count(first, ordinal),
+                "average_daily_revenue": round(revenue / window, 2)
+            }
+        return result
+
+    def trailing_revenue(self, window):
+        """
+        Revenue of the last window days up to the final sale date.
+        """
+
+        if self.end is None:
+            return 0.0
+        return self.window_revenue(self.end - window + 1, self.end)
+
+
+def sales_trend(transactions, period="daily", aggregates=None):
+    """
+    Sales trend per day, ISO week or month.
+
+    Args:
+        transactions (list): list of validated transaction dictionaries
+        period (str): "daily", "weekly" or "monthly"
+        aggregates (dict): precomputed aggregate_transactions() result (optional)
+
+    Returns:
+        dict: bucket -> statistics, in calendar order
+    """
+
+    if period not in ("daily", "weekly", "monthly"):
+        raise ValueError(f"Unsupported period: {period}")
+
+    series = SalesTimeSeries.from_transactions(transactions, aggregates)
+    return getattr(series, period)()
+
+
+def rolling_revenue(transactions, window=7, aggregates=None):
+    """
+    Trailing window revenue for every date with sales (see SalesTimeSeries.rolling).
+    """
+
+    return SalesTimeSeries.from_transactions(transactions, aggregates).rolling(window)
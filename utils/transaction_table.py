@@ -0,0 +1,364 @@
+# utils/transaction_table.py
+
+# Columnar Transaction Store
+
+from array import array
+
+import numpy as np
+
+from utils.transaction import Transaction
+
+
+def _encode(value, codes, categories):
+    # Dictionary-encode a column, assigning codes in first-seen order
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(categories)
+        categories.append(value)
+    return code
+
+
+def _recode(codes, categories):
+    # Re-encode a subset of a column in its own first-seen order, dropping
+    # unused categories; first occurrences come from one unbuffered
+    # minimum.at pass instead of sorting the rows
+    first = np.full(len(categories), len(codes), dtype=np.intp)
+    np.minimum.at(first, codes, np.arange(len(codes)))
+    used = np.flatnonzero(first < len(codes))
+    order = used[np.argsort(first[used], kind="stable")]
+    if len(order) == len(categories) and np.array_equal(order, used):
+        return codes, categories
+
+    remap = np.zeros(len(categories), dtype=np.int32)
+    remap[order] = np.arange(len(order), dtype=np.int32)
+    return remap[codes], [categories[code] for code in order.tolist()]
+
+
+class TransactionTable:
+    """
+    Columnar store of validated transactions.
+
+    Quantity and UnitPrice are kept as NumPy arrays; Region, ProductName,
+    ProductID, CustomerID and Date are dictionary-encoded as integer codes
+    into small category lists. Codes follow first-seen order, so ties are
+    broken exactly like the dict-based functions in data_processor.
+    TransactionID is a fixed-width NumPy string column, converted once here
+    so validation and take() can use it directly.
+    """
+
+    def __init__(self, transaction_ids, quantity, unit_price,
+                 region_codes, regions, product_codes, products,
+                 product_id_codes, product_ids,
+                 customer_codes, customers, date_codes, dates):
+        # No copy when it already is a string array (e.g. memory-mapped)
+        self.transaction_ids = np.asarray(transaction_ids, dtype=str)
+        self.quantity = quantity
+        self.unit_price = unit_price
+        self.region_codes = region_codes
+        self.regions = regions
+        self.product_codes = product_codes
+        self.products = products
+        self.product_id_codes = product_id_codes
+        self.product_ids = product_ids
+        self.customer_codes = customer_codes
+        self.customers = customers
+        self.date_codes = date_codes
+        self.dates = dates
+        self._amount = None
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """
+        Builds a table from transaction dictionaries.
+
+        Args:
+            transactions (iterable): validated transaction dictionaries
+
+        Returns:
+            TransactionTable: columnar copy of the transactions
+        """
+
+        transaction_ids = []
+        quantity = array('q')
+        unit_price = array('d')
+        columns = {
+            name: (array('i'), {}, [])
+            for name in ("Region", "ProductName", "ProductID", "CustomerID", "Date")
+        }
+        encoded = [(name,) + columns[name] for name in columns]
+
+        for tx in transactions:
+            transaction_ids.append(tx["TransactionID"])
+            quantity.append(tx["Quantity"])
+            unit_price.append(tx["UnitPrice"])
+
+            for name, column, codes, categories in encoded:
+                column.append(_encode(tx[name], codes, categories))
+
+        def codes_of(name):
+            return np.frombuffer(columns[name][0], dtype=np.int32)
+
+        def categories_of(name):
+            return columns[name][2]
+
+        return cls(
+            transaction_ids,
+            np.frombuffer(quantity, dtype=np.int64),
+            np.frombuffer(unit_price, dtype=np.float64),
+            codes_of("Region"), categories_of("Region"),
+            codes_of("ProductName"), categories_of("ProductName"),
+            codes_of("ProductID"), categories_of("ProductID"),
+            codes_of("CustomerID"), categories_of("CustomerID"),
+            codes_of("Date"), categories_of("Date")
+        )
+
+    def __len__(self):
+        return len(self.quantity)
+
+    @property
+    def amount(self):
+        """Per-row Quantity * UnitPrice, computed once."""
+        if self._amount is None:
+            self._amount = self.quantity * self.unit_price
+        return self._amount
+
+    def iter_rows(self):
+        """
+        Yields the rows back as Transaction records.
+        """
+
+        # tolist() turns NumPy (possibly memory-mapped) columns into plain values once
+        transaction_ids = self.transaction_ids.tolist()
+        dates, product_ids, products = self.dates, self.product_ids, self.products
+        customers, regions = self.customers, self.regions
+
+        for row in zip(transaction_ids, self.date_codes.tolist(), self.product_id_codes.tolist(),
+                       self.product_codes.tolist(), self.quantity.tolist(), self.unit_price.tolist(),
+                       self.customer_codes.tolist(), self.region_codes.tolist()):
+            yield Transaction(
+                row[0], dates[row[1]], product_ids[row[2]], products[row[3]],
+                row[4], row[5], customers[row[6]], regions[row[7]]
+            )
+
+    def take(self, rows):
+        """
+        Returns a new table holding only the selected rows.
+
+        Categories are re-encoded in the first-seen order of the selection,
+        so the result ranks and breaks ties exactly like a table built from
+        those rows.
+
+        Args:
+            rows (ndarray): boolean row mask or row positions
+
+        Returns:
+            TransactionTable: the selected rows
+        """
+
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+
+        return TransactionTable(
+            self.transaction_ids[rows],
+            self.quantity[rows],
+            self.unit_price[rows],
+            *_recode(self.region_codes[rows], self.regions),
+            *_recode(self.product_codes[rows], self.products),
+            *_recode(self.product_id_codes[rows], self.product_ids),
+            *_recode(self.customer_codes[rows], self.customers),
+            *_recode(self.date_codes[rows], self.dates)
+        )
+
+    # ---------- GROUP-BY HELPERS ----------
+
+    def _group_sum(self, codes, categories, weights=None):
+        # np.bincount adds weights in row order, matching the Python loops bit for bit
+        return np.bincount(codes, weights=weights, minlength=len(categories))
+
+    def _distinct_pairs(self, left_codes, right_codes, right_size):
+        # Unique (left, right) code pairs encoded into one int64 key
+        keys = left_codes.astype(np.int64) * right_size + right_codes
+        keys.sort()
+        if len(keys):
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        return keys // right_size, keys % right_size
+
+    def _top_codes(self, values, n=None):
+        # Codes of the n largest values, highest first, ties in code order.
+        # argpartition keeps this O(m) plus a sort of the n (and tied) winners.
+        if n is None or n >= len(values):
+            return np.argsort(-values, kind="stable")
+        if n <= 0:
+            return np.empty(0, dtype=np.intp)
+
+        cutoff = values[np.argpartition(-values, n - 1)[n - 1]]
+        candidates = np.flatnonzero(values >= cutoff)
+        order = np.argsort(-values[candidates], kind="stable")[:n]
+        return candidates[order]
+
+    # ---------- ANALYTICS ----------
+
+    def calculate_total_revenue(self):
+        """
+        Calculates total revenue from all transactions.
+
+        Returns:
+            float: total revenue
+        """
+
+        if not len(self):
+            return 0.0
+
+        # cumsum adds sequentially, so the total matches the dict path exactly
+        return round(float(np.cumsum(self.amount)[-1]), 2)
+
+    def region_wise_sales(self, n=None):
+        """
+        Analyzes sales by region.
+
+        Args:
+            n (int): only return the top n regions (optional, default all)
+
+        Returns:
+            dict: region-wise sales statistics
+        """
+
+        total_revenue = self.calculate_total_revenue()
+        revenue = self._group_sum(self.region_codes, self.regions, self.amount).tolist()
+        counts = self._group_sum(self.region_codes, self.regions).tolist()
+
+        # Rank on the rounded totals, as the dict-based version does
+        order = self._top_codes(np.array([round(value, 2) for value in revenue]), n).tolist()
+
+        region_data = {}
+        for code in order:
+            region_data[self.regions[code]] = {
+                "total_sales": round(revenue[code], 2),
+                "transaction_count": counts[code],
+                "percentage": round((revenue[code] / total_revenue) * 100, 2)
+            }
+
+        return region_data
+
+    def _product_totals(self):
+        quantity = self._group_sum(self.product_codes, self.products, self.quantity)
+        revenue = self._group_sum(self.product_codes, self.products, self.amount)
+        return quantity.astype(np.int64), revenue
+
+    def top_selling_products(self, n=5):
+        """
+        Finds top n products by total quantity sold.
+
+        Returns:
+            list: list of tuples (ProductName, TotalQuantity, TotalRevenue)
+        """
+
+        quantity, revenue = self._product_totals()
+        order = self._top_codes(quantity, n)
+
+        return [
+            (self.products[code], int(quantity[code]), round(float(revenue[code]), 2))
+            for code in order.tolist()
+        ]
+
+    def customer_analysis(self, n=None):
+        """
+        Analyzes customer purchase patterns
+
+        Args:
+            n (int): only return the top n customers (optional, default all)
+
+        Returns:
+            dict: customer-wise statistics sorted by total_spent descending
+        """
+
+        spent = self._group_sum(self.customer_codes, self.customers, self.amount)
+        counts = self._group_sum(self.customer_codes, self.customers).astype(np.int64)
+
+        # Distinct products per customer
+        pair_customers, pair_products = self._distinct_pairs(
+            self.customer_codes, self.product_codes, len(self.products)
+        )
+        bounds = np.searchsorted(pair_customers, np.arange(len(self.customers) + 1))
+        pair_products = pair_products.tolist()
+        bounds = bounds.tolist()
+
+        spent_list = spent.tolist()
+        counts_list = counts.tolist()
+
+        customer_data = {}
+        for code in self._top_codes(spent, n).tolist():
+            customer_data[self.customers[code]] = {
+                "total_spent": spent_list[code],
+                "purchase_count": counts_list[code],
+                "products_bought": [
+                    self.products[p] for p in pair_products[bounds[code]:bounds[code + 1]]
+                ],
+                "avg_order_value": round(spent_list[code] / counts_list[code], 2)
+            }
+
+        return customer_data
+
+    def daily_sales_trend(self):
+        """
+        Analyzes sales trends by date
+
+        Returns:
+            dict: date-wise sales statistics sorted chronologically
+        """
+
+        revenue = self._group_sum(self.date_codes, self.dates, self.amount).tolist()
+        counts = self._group_sum(self.date_codes, self.dates).tolist()
+
+        pair_dates, _ = self._distinct_pairs(
+            self.date_codes, self.customer_codes, len(self.customers)
+        )
+        unique_customers = np.bincount(pair_dates, minlength=len(self.dates)).tolist()
+
+        daily_data = {}
+        for code in sorted(range(len(self.dates)), key=self.dates.__getitem__):
+            daily_data[self.dates[code]] = {
+                "revenue": round(revenue[code], 2),
+                "transaction_count": counts[code],
+                "unique_customers": unique_customers[code]
+            }
+
+        return daily_data
+
+    def find_peak_sales_day(self):
+        """
+        Identifies the date with highest revenue
+
+        Returns:
+            tuple: (date, revenue, transaction_count)
+        """
+
+        if not len(self):
+            return (None, 0.0, 0)
+
+        revenue = self._group_sum(self.date_codes, self.dates, self.amount)
+        code = int(np.argmax(revenue))
+
+        if revenue[code] <= 0:
+            return (None, 0.0, 0)
+
+        count = int(np.count_nonzero(self.date_codes == code))
+        return (self.dates[code], round(float(revenue[code]), 2), count)
+
+    def low_performing_products(self, threshold=10):
+        """
+        Identifies products with low sales
+
+        Returns:
+            list of tuples: (ProductName, TotalQuantity, TotalRevenue)
+        """
+
+        quantity, revenue = self._product_totals()
+        codes = np.flatnonzero(quantity < threshold)
+        codes = codes[np.argsort(quantity[codes], kind="stable")]
+
+        return [
+            (self.products[code], int(quantity[code]), round(float(revenue[code]), 2))
+            for code in codes.tolist()
+        ]